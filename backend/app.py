@@ -1,16 +1,16 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, abort, g, request, jsonify, send_file, url_for
 from flask_cors import CORS
-import os
-import sqlite3
-import io
-import json
 from werkzeug.utils import secure_filename
-from PIL import Image
-import numpy as np
-from utils.classifier import ElectricalSocketClassifier
-from utils.database import Database
-import uuid
+import os
 import time
+from types import SimpleNamespace
+from utils.database import Database
+from utils.jobs import JobManager, QueueFull
+from utils.result_cache import ResultCache
+from utils.artifact_cache import ArtifactCache
+from utils.batching import MicroBatcher
+from utils.lazy import LazyComponent
+from utils.metrics import metrics
 
 # Get the directory of the current file (backend)
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,32 +19,132 @@ project_root = os.path.dirname(current_dir)
 # Path to the React build folder
 react_build_path = os.path.join(project_root, 'frontend', 'build')
 
-# Debug: Print paths to see what's happening
-print(f"Current dir: {current_dir}")
-print(f"Project root: {project_root}")
-print(f"React build path: {react_build_path}")
-print(f"Build path exists: {os.path.exists(react_build_path)}")
-if os.path.exists(react_build_path):
-    print(f"Build contents: {os.listdir(react_build_path)}")
-
-# Create Flask app with proper static configuration
-app = Flask(__name__, 
-            static_folder=react_build_path,
-            static_url_path='')
+# Create Flask app; the React build is served from the in-memory manifest below
+app = Flask(__name__, static_folder=None)
 CORS(app)
 
 # Configuration
-app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['GENERATED_FOLDER'] = 'generated'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_BATCH_IMAGES'] = 64
+app.config['RESULT_CACHE_SIZE'] = 1024
+app.config['RESULT_CACHE_TTL'] = 3600  # seconds
+# Optional SQLite file shared by all worker processes, e.g. data/result_cache.db
+app.config['RESULT_CACHE_DB'] = os.environ.get('RESULT_CACHE_DB')
+app.config['STL_CACHE_MAX_BYTES'] = 256 * 1024 * 1024
+# Queued classify jobs hold their upload in memory; further requests get 429 once the queue is full
+app.config['CLASSIFY_QUEUE_LIMIT'] = int(os.environ.get('CLASSIFY_QUEUE_LIMIT', 64))
+# STL renders run on their own pool; further requests get 429 once the queue is full
+app.config['STL_RENDER_WORKERS'] = int(os.environ.get('STL_RENDER_WORKERS', 2))
+app.config['STL_RENDER_QUEUE_LIMIT'] = int(os.environ.get('STL_RENDER_QUEUE_LIMIT', 32))
+app.config['MICRO_BATCH_SIZE'] = 16
+app.config['MICRO_BATCH_WAIT_MS'] = 5.0
+# Each classify job thread blocks in the micro-batcher until its image is scored,
+# so with the batched (ONNX) engine the pool must hold at least one full batch
+app.config['CLASSIFY_WORKERS'] = int(os.environ.get('CLASSIFY_WORKERS', 0)) or (
+    max(app.config['MICRO_BATCH_SIZE'], min(8, (os.cpu_count() or 1) + 2))
+    if os.environ.get('CLASSIFIER_ENGINE') == 'onnx' else None
+)
+# Worker processes for classification; 0 classifies on the request's own process
+app.config['INFERENCE_WORKERS'] = int(os.environ.get('INFERENCE_WORKERS', 0))
 
 # Create directories
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['GENERATED_FOLDER'], exist_ok=True)
 
-# Initialize components
-classifier = ElectricalSocketClassifier()
+def _load_inference():
+    """Build the classifier with its optional worker pool and micro-batcher"""
+    # Imported here: OpenCV, NumPy and the model runtime dominate import time
+    from utils.classifier import ElectricalSocketClassifier
+    from utils.worker_pool import InferenceWorkerPool
+    
+    classifier = ElectricalSocketClassifier()
+    pool = InferenceWorkerPool(
+        app.config['INFERENCE_WORKERS'],
+        engine=classifier.engine,
+        model_path=classifier.model_path,
+        view='resized' if classifier.model is not None else 'analysis',
+        on_model_error=classifier.use_rules
+    ) if app.config['INFERENCE_WORKERS'] > 0 else None
+    predict_images = pool.predict_batch if pool is not None else classifier.predict_batch
+    # Concurrent requests share forward passes; the rule-based engine gains nothing from batching
+    batcher = MicroBatcher(
+        predict_images,
+        max_batch_size=app.config['MICRO_BATCH_SIZE'],
+        max_wait_ms=app.config['MICRO_BATCH_WAIT_MS']
+    ) if classifier.model is not None else None
+    return SimpleNamespace(classifier=classifier, pool=pool, batcher=batcher, predict_images=predict_images)
+
+def _load_stl_generator():
+    from utils.stl_generator import STLGenerator
+    return STLGenerator()
+
+def _load_static_assets():
+    from utils.static_assets import StaticAssets
+    return StaticAssets(react_build_path)
+
+# Initialize components; the classifier and STL generator are built on first
+# use, or ahead of time by warm_up()
+inference = LazyComponent(_load_inference, 'classifier')
+stl = LazyComponent(_load_stl_generator, 'stl-generator')
+static_assets = LazyComponent(_load_static_assets, 'static-assets')
+
+def warm_up():
+    """Build the lazily loaded components now instead of on the first request"""
+    inference.get()
+    stl.get()
+    static_assets.get()
+
+def _batcher_stats():
+    # Never builds the classifier just to report on it
+    loaded = inference.peek()
+    return loaded.batcher.stats() if loaded is not None and loaded.batcher is not None else None
+
 database = Database()
+stl_cache = ArtifactCache(app.config['GENERATED_FOLDER'], max_bytes=app.config['STL_CACHE_MAX_BYTES'])
+jobs = JobManager(
+    max_workers=app.config['CLASSIFY_WORKERS'],
+    max_pending=app.config['CLASSIFY_QUEUE_LIMIT']
+)
+render_jobs = JobManager(
+    max_workers=app.config['STL_RENDER_WORKERS'],
+    max_pending=app.config['STL_RENDER_QUEUE_LIMIT']
+)
+result_cache = ResultCache(
+    max_entries=app.config['RESULT_CACHE_SIZE'],
+    ttl=app.config['RESULT_CACHE_TTL'],
+    shared_db_path=app.config['RESULT_CACHE_DB']
+)
+
+# Metrics (served in Prometheus text format from /api/metrics)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    'outlet_http_request_seconds', 'HTTP request latency', ['endpoint', 'method', 'status']
+)
+REQUEST_STAGE_SECONDS = metrics.histogram(
+    'outlet_request_stage_seconds', 'Time spent in each stage of a request or its job', ['endpoint', 'stage']
+)
+CLASSIFICATIONS_TOTAL = metrics.counter(
+    'outlet_classifications_total', 'Images classified, by outlet type and result cache outcome', ['outlet_type', 'cache']
+)
+metrics.gauge('outlet_result_cache_entries', 'Classification results held in memory',
+              lambda: result_cache.stats()['size'])
+metrics.gauge('outlet_result_cache_hit_ratio', 'Classification result cache hit ratio',
+              lambda: result_cache.stats()['hit_rate'])
+metrics.gauge('outlet_render_queue_depth', 'STL renders queued or running', render_jobs.pending)
+metrics.gauge('outlet_batcher_queue_depth', 'Images waiting for the micro-batcher',
+              lambda: (_batcher_stats() or {}).get('queue_depth'))
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _observe_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, request.endpoint or 'unmatched', request.method, response.status_code
+        )
+    return response
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
@@ -55,7 +155,8 @@ def allowed_file(filename):
 # API Routes (must come before catch-all route)
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy'})
+    # 'ready' turns true once the classifier and STL generator are loaded
+    return jsonify({'status': 'healthy', 'ready': inference.ready and stl.ready})
 
 @app.route('/api/classify', methods=['POST'])
 def classify_outlet():
@@ -70,33 +171,386 @@ def classify_outlet():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type'}), 400
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(filepath)
+        # Read the upload straight from the request stream; nothing touches disk
+        with REQUEST_STAGE_SECONDS.time('classify', 'read_upload'):
+            image_bytes = file.read()
         
-        # Simulate processing time for "We are recognizing your power outlet" message
-        time.sleep(2)
+        # Retried or re-submitted photos are answered before any decoding
+        with REQUEST_STAGE_SECONDS.time('classify', 'cache_lookup'):
+            cache_key = result_cache.key_for(image_bytes)
+            cached_result = result_cache.get(cache_key)
+        if cached_result is not None:
+            CLASSIFICATIONS_TOTAL.inc(cached_result['outlet_type'], 'hit')
+            return jsonify({
+                'success': True,
+                'status': 'completed',
+                'cache': 'hit',
+                'result': _classification_response(cached_result)
+            })
         
-        # Classify the image
-        classification_result = classifier.predict(filepath)
+        # Classification runs in the background; the client polls the job
+        try:
+            job_id = jobs.submit('classify', _classify_job, image_bytes, cache_key)
+        except QueueFull:
+            return _queue_full_response('Too many classifications in progress, please retry shortly')
         
-        # Get product information from database
-        product_info = database.get_product_by_type(classification_result['outlet_type'])
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'cache': 'miss',
+            'status_url': url_for('get_job', job_id=job_id)
+        }), 202
         
-        # Clean up uploaded file
-        os.remove(filepath)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _queue_full_response(message):
+    response = jsonify({'error': message})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
+def _classify_job(progress, image_bytes, cache_key):
+    """Background job: classify an uploaded image and look up its product"""
+    progress('classifying', 0.1)
+    classification_result = _predict(image_bytes)
+    _cache_classification(cache_key, classification_result)
+    CLASSIFICATIONS_TOTAL.inc(classification_result['outlet_type'], 'miss')
+    
+    progress('looking_up_product', 0.8)
+    with REQUEST_STAGE_SECONDS.time('classify', 'product_lookup'):
+        return _classification_response(classification_result)
+
+def _predict(image_bytes):
+    """Classify one upload via the micro-batcher or worker pool when configured"""
+    from utils.image_pipeline import ImageTooLarge
+    
+    engine = inference.get()
+    with REQUEST_STAGE_SECONDS.time('classify', 'decode'):
+        try:
+            # Decode on this job thread so the batcher and workers only run inference
+            image = engine.classifier.decode_image(image_bytes)
+        except ImageTooLarge:
+            # Fails the job, as the batch endpoint reports it per image
+            raise
+        except Exception:
+            image = None
+    
+    with REQUEST_STAGE_SECONDS.time('classify', 'inference'):
+        if image is None:
+            # Undecodable uploads get the classifier's fallback result directly
+            return engine.classifier.predict_bytes(image_bytes)
+        if engine.batcher is not None:
+            return engine.batcher.predict(image)
+        if engine.pool is not None:
+            return engine.pool.predict_batch([image])[0]
+        return engine.classifier.predict_image(image)
+
+def _cache_classification(cache_key, classification_result):
+    # Fallback results carry a note and may be transient, so they are not cached
+    if 'note' not in classification_result:
+        result_cache.set(cache_key, classification_result)
+
+def _classification_response(classification_result):
+    """Attach product information from the database to a classification"""
+    product_info = database.get_product_by_type(classification_result['outlet_type'])
+    
+    return {
+        'success': True,
+        'classification': classification_result,
+        'product': product_info
+    }
+
+@app.route('/api/classify/batch', methods=['POST'])
+def classify_outlet_batch():
+    try:
+        files = request.files.getlist('images')
+        if not files:
+            return jsonify({'error': 'No image files provided'}), 400
+        
+        if len(files) > app.config['MAX_BATCH_IMAGES']:
+            return jsonify({'error': f"At most {app.config['MAX_BATCH_IMAGES']} images per batch"}), 400
+        
+        # Invalid entries are reported per image instead of failing the batch
+        uploads = []
+        for file in files:
+            if file.filename == '':
+                uploads.append((file.filename, None, 'No file selected'))
+            elif not allowed_file(file.filename):
+                uploads.append((file.filename, None, 'Invalid file type'))
+            else:
+                uploads.append((file.filename, file.read(), None))
+        
+        try:
+            job_id = jobs.submit('classify_batch', _classify_batch_job, uploads)
+        except QueueFull:
+            return _queue_full_response('Too many classifications in progress, please retry shortly')
         
         return jsonify({
             'success': True,
-            'classification': classification_result,
-            'product': product_info
-        })
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': url_for('get_job', job_id=job_id)
+        }), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _classify_batch_job(progress, uploads):
+    """Background job: classify many images with one batched predict call"""
+    errors = {i: error for i, (_, _, error) in enumerate(uploads) if error is not None}
+    
+    # Images seen before are served from the result cache and never decoded
+    predictions = {}
+    cache_keys = {}
+    with REQUEST_STAGE_SECONDS.time('classify_batch', 'cache_lookup'):
+        for i, (_, data, error) in enumerate(uploads):
+            if error is None:
+                cache_keys[i] = result_cache.key_for(data)
+                cached_result = result_cache.get(cache_keys[i])
+                if cached_result is not None:
+                    predictions[i] = cached_result
+                    CLASSIFICATIONS_TOTAL.inc(cached_result['outlet_type'], 'hit')
+    
+    progress('decoding', 0.1)
+    engine = inference.get()
+    pending = [i for i in cache_keys if i not in predictions]
+    with REQUEST_STAGE_SECONDS.time('classify_batch', 'decode'):
+        decoded = engine.classifier.decode_batch([uploads[i][1] for i in pending])
+    
+    images = {}
+    for i, image in zip(pending, decoded):
+        if isinstance(image, Exception):
+            errors[i] = str(image)
+        else:
+            images[i] = image
+    
+    progress('classifying', 0.4)
+    indices = sorted(images)
+    with REQUEST_STAGE_SECONDS.time('classify_batch', 'inference'):
+        batch_predictions = engine.predict_images([images[i] for i in indices])
+    for i, prediction in zip(indices, batch_predictions):
+        predictions[i] = prediction
+        _cache_classification(cache_keys[i], prediction)
+        CLASSIFICATIONS_TOTAL.inc(prediction['outlet_type'], 'miss')
+    
+    # Each outlet type only needs to be looked up once per batch
+    progress('looking_up_products', 0.8)
+    products = {}
+    with REQUEST_STAGE_SECONDS.time('classify_batch', 'product_lookup'):
+        for prediction in predictions.values():
+            outlet_type = prediction['outlet_type']
+            if outlet_type not in products:
+                products[outlet_type] = database.get_product_by_type(outlet_type)
+    
+    results = []
+    for i, (filename, _, _) in enumerate(uploads):
+        if i in errors:
+            results.append({'index': i, 'filename': filename, 'success': False, 'error': errors[i]})
+        else:
+            results.append({
+                'index': i,
+                'filename': filename,
+                'success': True,
+                'classification': predictions[i],
+                'product': products[predictions[i]['outlet_type']]
+            })
+    
+    return {'success': True, 'results': results}
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/generate-stl', methods=['POST'])
+def generate_stl():
+    try:
+        options = request.get_json(silent=True) or {}
+        outlet_type = options.get('outlet_type')
+        if not outlet_type:
+            return jsonify({'error': 'No outlet type provided'}), 400
+        
+        product_specs = database.get_product_specs(outlet_type)
+        if product_specs is None:
+            return jsonify({'error': f'Unknown outlet type: {outlet_type}'}), 404
+        
+        arrangement = options.get('arrangement', 'single')
+        custom_options = options.get('custom_options') or {}
+        if not isinstance(custom_options, dict):
+            return jsonify({'error': 'custom_options must be an object'}), 400
+        
+        stl_generator = stl.get()
+        try:
+            layout = stl_generator.arrangement_config(arrangement, product_specs)
+            stl_generator.shell_dimensions(custom_options, product_specs)
+            stl_generator.chord_tolerance(custom_options)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        output_format = options.get('format', 'stl')
+        if output_format not in stl_generator.OUTPUT_FORMATS:
+            return jsonify({'error': f'Unknown format: {output_format}',
+                            'formats': sorted(stl_generator.OUTPUT_FORMATS)}), 400
+        
+        # Precision only affects text formats; leave it out of the key for the others
+        precision = None
+        if output_format in stl_generator.TEXT_FORMATS:
+            precision = options.get('precision', stl_generator.DEFAULT_PRECISION)
+            if not isinstance(precision, int) or not 1 <= precision <= 9:
+                return jsonify({'error': 'precision must be an integer between 1 and 9'}), 400
+        
+        extension = stl_generator.OUTPUT_FORMATS[output_format][0]
+        filename = f"{outlet_type.replace('/', '_')}_{layout['name']}{extension}"
+        
+        # Identical inputs always produce identical bytes, so the output is cached by input hash
+        # ("quad" and "2x2" are the same layout and share an entry)
+        key = stl_cache.key_for(stl_generator.VERSION, product_specs, _layout_key(layout), custom_options,
+                                output_format, precision)
+        download_url = url_for('download_stl', key=key, filename=filename, format=output_format)
+        path = stl_cache.get(key, extension)
+        if path is not None:
+            return jsonify({
+                'success': True,
+                'status': 'completed',
+                'cache': 'hit',
+                'result': _render_result(key, path, filename, download_url)
+            })
+        
+        # Rendering runs on the bounded render pool; identical in-flight requests share one job
+        try:
+            job_id = render_jobs.submit('render_stl', _render_stl_job, key, product_specs, arrangement,
+                                        custom_options, output_format, precision, filename, download_url,
+                                        key=key)
+        except QueueFull:
+            return _queue_full_response('Too many STL renders in progress, please retry shortly')
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'cache': 'miss',
+            'status_url': url_for('get_job', job_id=job_id)
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/preview-stl', methods=['POST'])
+def preview_stl():
+    # The low-poly preview is cheap enough to render inline, skipping the render queue
+    try:
+        options = request.get_json(silent=True) or {}
+        outlet_type = options.get('outlet_type')
+        if not outlet_type:
+            return jsonify({'error': 'No outlet type provided'}), 400
+        
+        product_specs = database.get_product_specs(outlet_type)
+        if product_specs is None:
+            return jsonify({'error': f'Unknown outlet type: {outlet_type}'}), 404
+        
+        arrangement = options.get('arrangement', 'single')
+        custom_options = options.get('custom_options') or {}
+        if not isinstance(custom_options, dict):
+            return jsonify({'error': 'custom_options must be an object'}), 400
+        custom_options = dict(custom_options, detail='preview')
+        custom_options.pop('chord_tolerance', None)
+        
+        stl_generator = stl.get()
+        try:
+            layout = stl_generator.arrangement_config(arrangement, product_specs)
+            stl_generator.shell_dimensions(custom_options, product_specs)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        filename = f"{outlet_type.replace('/', '_')}_{layout['name']}_preview.stl"
+        
+        key = stl_cache.key_for(stl_generator.VERSION, product_specs, _layout_key(layout), custom_options, 'stl', None)
+        path = stl_cache.get(key)
+        if path is None:
+            def write(f):
+                if not stl_generator.generate_outlet_stl(product_specs, arrangement, custom_options, f):
+                    raise Exception('Error generating STL preview')
+            path = stl_cache.put(key, write)
+        
+        return _send_stl(path, key, filename)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _layout_key(layout):
+    return [layout['rows'], layout['cols'], layout['pitch']]
+
+def _render_stl_job(progress, key, product_specs, arrangement, custom_options, output_format, precision,
+                    filename, download_url):
+    """Background job: render a mesh file into the artifact cache"""
+    progress('rendering', 0.1)
+    stl_generator = stl.get()
+    
+    def write(f):
+        if not stl_generator.generate_outlet_stl(product_specs, arrangement, custom_options, f,
+                                                 output_format, precision or stl_generator.DEFAULT_PRECISION):
+            raise Exception('Error generating STL file')
+    
+    path = stl_cache.put(key, write, stl_generator.OUTPUT_FORMATS[output_format][0])
+    return _render_result(key, path, filename, download_url)
+
+def _render_result(key, path, filename, download_url):
+    return {'key': key, 'filename': filename, 'size': os.path.getsize(path), 'download_url': download_url}
+
+@app.route('/api/download/<key>', methods=['GET'])
+def download_stl(key):
+    if not stl_cache.is_valid_key(key):
+        return jsonify({'error': 'Invalid download key'}), 400
+    
+    output_formats = stl.get().OUTPUT_FORMATS
+    output_format = request.args.get('format', 'stl')
+    if output_format not in output_formats:
+        return jsonify({'error': f'Unknown format: {output_format}'}), 400
+    extension, mimetype = output_formats[output_format]
+    
+    path = stl_cache.get(key, extension)
+    if path is None:
+        return jsonify({'error': 'File not found or expired'}), 404
+    
+    filename = secure_filename(request.args.get('filename', ''))
+    if not filename.endswith(extension):
+        filename = f"outlet_{key[:12]}{extension}"
+    return _send_stl(path, key, filename, mimetype)
+
+def _send_stl(path, key, filename, mimetype='model/stl'):
+    # Content-addressed files never change, so clients may cache them forever
+    try:
+        response = send_file(path, mimetype=mimetype, as_attachment=True, download_name=filename,
+                             etag=key, conditional=True, max_age=31536000)
+    except FileNotFoundError:
+        # Evicted by another thread or process since the cache lookup
+        return jsonify({'error': 'File not found or expired'}), 404
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/inference/stats', methods=['GET'])
+def get_inference_stats():
+    loaded = inference.peek()
+    return jsonify({
+        'engine': loaded.classifier.engine if loaded is not None else None,
+        'ready': loaded is not None,
+        'workers': app.config['INFERENCE_WORKERS'],
+        'batching': _batcher_stats()
+    })
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({'classification': result_cache.stats(), 'stl': stl_cache.stats()})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/outlet-types', methods=['GET'])
 def get_outlet_types():
     try:
@@ -108,41 +562,59 @@ def get_outlet_types():
 # Serve static files explicitly
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    static_dir = os.path.join(react_build_path, 'static')
-    if os.path.exists(static_dir):
-        return send_from_directory(static_dir, filename)
-    return send_from_directory(react_build_path, filename)
+    assets = static_assets.get()
+    asset = assets.get(f'static/{filename}') or assets.get(filename)
+    if asset is None:
+        abort(404)
+    return _send_asset(asset)
 
 # Serve React App (catch-all route - must be last)
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_react_app(path):
-    # Handle static files (css, js, etc.)
-    if path and (path.endswith('.css') or path.endswith('.js') or path.endswith('.map')):
-        # Try to serve from static folder first
-        static_file_path = os.path.join(react_build_path, 'static', path)
-        if os.path.exists(static_file_path):
-            return send_file(static_file_path)
-        
-        # Try to serve from build root
-        build_file_path = os.path.join(react_build_path, path)
-        if os.path.exists(build_file_path):
-            return send_file(build_file_path)
-    
-    # Handle other static assets
-    if path and os.path.exists(os.path.join(react_build_path, path)):
-        return send_from_directory(react_build_path, path)
+    assets = static_assets.get()
+    asset = None
+    if path:
+        # css/js/map files may be requested without their static/ prefix
+        if path.endswith(('.css', '.js', '.map')):
+            asset = assets.get(f'static/{path}')
+        asset = asset or assets.get(path)
     
     # Default to index.html for SPA routing
-    index_path = os.path.join(react_build_path, 'index.html')
-    if os.path.exists(index_path):
-        return send_file(index_path)
-    else:
+    asset = asset or assets.index
+    if asset is None:
         return jsonify({'error': 'React build not found. Please run the build process.'}), 404
+    return _send_asset(asset)
+
+def _send_asset(asset):
+    """Respond with a build file from memory, precompressed when the client accepts it"""
+    if asset.data is None:
+        response = send_file(asset.full_path, mimetype=asset.mimetype, etag=asset.etag, conditional=True)
+    else:
+        coding, body = asset.select(request.accept_encodings)
+        response = Response(body, mimetype=asset.mimetype)
+        if coding is not None:
+            response.headers['Content-Encoding'] = coding
+        if asset.encodings:
+            response.vary.add('Accept-Encoding')
+        # Each encoding is a different representation and needs its own strong ETag
+        response.set_etag(asset.etag if coding is None else f'{asset.etag}-{coding}')
+        response.make_conditional(request)
+    
+    # Fingerprinted files never change under the same name; everything else
+    # (index.html in particular) is revalidated against its ETag
+    if asset.immutable:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 if __name__ == '__main__':
     # Initialize database
     database.initialize()
-    import os
+    # Serve health checks right away and load the classifier meanwhile
+    inference.warm_in_background()
+    stl.warm_in_background()
+    static_assets.warm_in_background()
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host='0.0.0.0', port=port) 
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Gunicorn configuration for production serving
+
+    cd backend && gunicorn --config gunicorn.conf.py app:app
+
+The app is imported once in the master (preload_app) and the worker
+processes are forked from it, so imports, the product catalog and other
+read-only state are shared copy-on-write. Threads, thread pools and model
+sessions are created lazily after the fork in each worker.
+
+Because the app is preloaded, SIGHUP restarts the workers from the master's
+already-imported code: it picks up configuration changes but not new
+application code. To deploy new code, restart the master, or send it USR2
+to start a new master alongside it and then TERM the old one.
+"""
+
+import os
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def _available_cores():
+    """Cores this process may run on, honouring CPU affinity and a cgroup v2 quota"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on macOS
+        cores = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cores = min(cores, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+cpu_count = _available_cores()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Classification is CPU-bound, so one process per core; a few threads per
+# process keep cheap requests (job polls, downloads) from queueing behind it.
+# WEB_CONCURRENCY is the variable most hosting platforms set.
+workers = _env_int('GUNICORN_WORKERS', _env_int('WEB_CONCURRENCY', cpu_count))
+threads = _env_int('GUNICORN_THREADS', 4)
+worker_class = 'gthread'
+
+preload_app = True
+
+# Connections are usually held open by a load balancer in front of the app
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+# On SIGTERM / SIGHUP, workers finish their in-flight requests within this window
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Recycle workers now and then to bound memory growth; jitter avoids all
+# workers restarting at once
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+def when_ready(server):
+    """Runs in the master once the app is loaded, before any worker is forked"""
+    import app as backend_app
+
+    backend_app.database.initialize()
+    # Load the catalog cache and the classifier now so every worker inherits them
+    backend_app.database.get_all_outlet_types()
+    backend_app.warm_up()
+    server.log.info("Database initialized, catalog cache and classifier loaded")
+
+def post_worker_init(worker):
+    """Load the classifier's model in each worker before it takes requests"""
+    import cv2
+    import app as backend_app
+
+    # Every worker runs its own thread pools; share the cores out between
+    # them instead of each sizing its pools to the whole machine
+    cores_per_worker = max(1, cpu_count // workers)
+    cv2.setNumThreads(1)
+    engine = backend_app.inference.get()
+    engine.classifier.decode_threads = cores_per_worker
+    if engine.classifier.model is not None and not os.environ.get('ONNX_INTRA_OP_THREADS'):
+        engine.classifier.model.intra_op_threads = cores_per_worker
+    # A model that fails to load switches this worker to rule-based classification
+    engine.classifier.load_model()
+    if engine.pool is not None:
+        engine.pool.start()
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+class ArtifactCache:
+    """Content-addressed file cache for generated artifacts such as STL files.
+
+    Files are named after a hash of the inputs that produced them, written
+    to a temporary file and renamed into place so readers never see a
+    partial artifact, and evicted least-recently-used once the directory
+    grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, extension='.stl'):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key_for(*inputs):
+        """Canonical hash of JSON-serializable inputs"""
+        canonical = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def is_valid_key(key):
+        return bool(KEY_PATTERN.match(key))
+
+    def path_for(self, key, extension=None):
+        return os.path.join(self.directory, key + (extension or self.extension))
+
+    def get(self, key, extension=None):
+        """Return the artifact path for key, or None if it is not cached"""
+        path = self.path_for(key, extension)
+        try:
+            # Bump the mtime so eviction treats the file as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._hits += 1
+        return path
+
+    def put(self, key, write_fn, extension=None):
+        """Create the artifact by calling write_fn(fileobj), returning its path"""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_fn(f)
+            os.replace(temp_path, self.path_for(key, extension))
+        except BaseException:
+            self._discard(temp_path)
+            raise
+
+        # Never evict the artifact just written, even if it alone exceeds max_bytes
+        self._evict(keep=self.path_for(key, extension))
+        return self.path_for(key, extension)
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _is_artifact(self, entry):
+        # Artifacts may use any extension; in-progress writes end in .tmp
+        return entry.is_file() and not entry.name.endswith('.tmp')
+
+    def _evict(self, keep=None):
+        """Delete least-recently-used artifacts, other than keep, until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if self._is_artifact(entry):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._discard(path)
+            total -= size
+
+    def stats(self):
+        """Hit counts for this process and the current size on disk"""
+        size = 0
+        count = 0
+        for entry in os.scandir(self.directory):
+            if self._is_artifact(entry):
+                size += entry.stat().st_size
+                count += 1
+
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': count,
+                'size_bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0
+            }
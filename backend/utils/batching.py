@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batched calls.
+
+    Request threads call predict(item) and block; a scheduler thread takes
+    whatever is queued, waits at most max_wait_ms for the batch to fill up to
+    max_batch_size, calls predict_fn(items) once and hands each caller its
+    own result.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = deque()  # (item, future)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._thread_pid = None
+
+        self._batches = 0
+        self._items = 0
+        self._max_queue_depth = 0
+        self._batch_sizes = {}  # power-of-two bucket upper bound -> count
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result"""
+        future = Future()
+        with self._condition:
+            self._ensure_thread()
+            self._pending.append((item, future))
+            self._max_queue_depth = max(self._max_queue_depth, len(self._pending))
+            self._condition.notify()
+        return future
+
+    def predict(self, item, timeout=None):
+        """Queue one item and wait for its result"""
+        return self.submit(item).result(timeout)
+
+    def _ensure_thread(self):
+        # Started on first use (and again after a fork) so pre-forking servers work
+        if self._thread is None or self._thread_pid != os.getpid():
+            self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            items = [item for item, _ in batch]
+            try:
+                results = self.predict_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"predict_fn returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _next_batch(self):
+        """Block until work arrives, then collect a batch bounded by size and wait time"""
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            size = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(size)]
+
+            self._batches += 1
+            self._items += size
+            bucket = 1
+            while bucket < size:
+                bucket *= 2
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            return batch
+
+    def stats(self):
+        """Queue depth and batch-size histogram (power-of-two buckets)"""
+        with self._condition:
+            return {
+                'queue_depth': len(self._pending),
+                'max_queue_depth': self._max_queue_depth,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'batches': self._batches,
+                'items': self._items,
+                'mean_batch_size': self._items / self._batches if self._batches else 0.0,
+                'batch_size_histogram': {f'le_{bucket}': count for bucket, count in sorted(self._batch_sizes.items())}
+            }
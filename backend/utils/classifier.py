@@ -1,11 +1,26 @@
 import numpy as np
-from PIL import Image
 import cv2
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .image_pipeline import DecodedImage
+from .inference import OnnxEngine, ModelLoadError
+from .metrics import metrics
+
+CLASSIFIER_STAGE_SECONDS = metrics.histogram(
+    'outlet_classifier_stage_seconds', 'Time spent in each classifier stage', ['stage']
+)
 
 class ElectricalSocketClassifier:
-    def __init__(self):
+    def __init__(self, engine=None, model_path=None, max_analysis_size=None, max_image_pixels=None):
         self.model = None
+        # 'onnx' runs an exported model; 'rules' is the contour-count demo classifier
+        self.engine = engine or os.environ.get('CLASSIFIER_ENGINE', 'rules')
+        self.model_path = model_path or os.environ.get('ONNX_MODEL_PATH', 'models/socket_classifier.onnx')
+        # Rule-based analysis runs on images downscaled to this longest side
+        self.max_analysis_size = max_analysis_size or _env_int('MAX_ANALYSIS_RESOLUTION') or 1600
+        # Larger images are refused before decoding
+        self.max_image_pixels = max_image_pixels or _env_int('MAX_IMAGE_PIXELS') or 50_000_000
         self.class_names = [
             'NEMA_5-15R',  # Standard US socket
             'NEMA_5-20R',  # US 20A socket
@@ -19,73 +34,218 @@ class ElectricalSocketClassifier:
             'USB_C'        # USB-C socket
         ]
         self.input_shape = (224, 224, 3)
+        self.decode_threads = None  # threads decoding a batch; defaults to the CPU count
+        self._decode_pool = None
+        self._decode_pool_lock = threading.Lock()
         self._build_model()
     
     def _build_model(self):
-        """Build a CNN model for electrical socket classification"""
-        # For demo purposes, we use rule-based classification
-        # In production, this would load a trained model
+        """Set up the ONNX inference engine, or rule-based classification as the fallback"""
+        if self.engine == 'onnx':
+            try:
+                self.model = OnnxEngine(
+                    self.model_path,
+                    self.class_names,
+                    intra_op_threads=_env_int('ONNX_INTRA_OP_THREADS'),
+                    inter_op_threads=_env_int('ONNX_INTER_OP_THREADS') or 1
+                )
+                print(f"ONNX classifier initialized - using model {self.model_path}")
+                return
+            except Exception as e:
+                print(f"ONNX engine unavailable ({e}), falling back to rule-based classification")
+        
+        self.engine = 'rules'
         self.model = None
         print("Demo classifier initialized - using rule-based classification")
     
-    def preprocess_image(self, image_path):
-        """Preprocess image for classification"""
+    def load_model(self):
+        """Create the model's inference session now, switching to rules if it cannot be loaded"""
+        if self.model is not None:
+            try:
+                self.model.load()
+            except ModelLoadError as e:
+                self.use_rules(e)
+    
+    def use_rules(self, reason):
+        """Switch to rule-based classification for good, e.g. after the model failed to load"""
+        if self.model is not None:
+            print(f"{reason}; switching to rule-based classification")
+        self.engine = 'rules'
+        self.model = None
+    
+    def preprocess_image(self, image):
+        """Preprocess image for classification.
+        
+        Accepts a file path, encoded bytes, a BGR array or a DecodedImage and
+        returns a (1, H, W, 3) float32 batch.
+        """
         try:
-            # Load image
-            image = Image.open(image_path)
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Resize to model input size
-            image = image.resize((self.input_shape[0], self.input_shape[1]))
-            
-            # Convert to numpy array and normalize
-            image_array = np.array(image) / 255.0
+            image_array = self.load_image(image).normalized
             
             # Add batch dimension
-            image_array = np.expand_dims(image_array, axis=0)
-            
-            return image_array
+            return np.expand_dims(image_array, axis=0)
             
         except Exception as e:
             raise Exception(f"Error preprocessing image: {str(e)}")
     
+    def preprocess_batch(self, images):
+        """Stack images into one (N, H, W, 3) float32 batch"""
+        batch = np.stack([self.load_image(image).resized for image in images]).astype(np.float32)
+        
+        # Normalize the whole batch in one vectorized pass
+        batch *= 1.0 / 255.0
+        return batch
+    
+    def load_image(self, image):
+        """Wrap a path, encoded bytes or BGR array in a lazily decoded DecodedImage"""
+        target_size = (self.input_shape[1], self.input_shape[0])
+        options = {'max_analysis_size': self.max_analysis_size, 'max_pixels': self.max_image_pixels}
+        if isinstance(image, DecodedImage):
+            return image
+        if isinstance(image, np.ndarray):
+            return DecodedImage.from_array(image, target_size, **options)
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            return DecodedImage.from_bytes(image, target_size, **options)
+        return DecodedImage.from_path(image, target_size, **options)
+    
+    def decode_image(self, image_bytes):
+        """Decode encoded image bytes, producing the views the classifier will use"""
+        image = self.load_image(image_bytes)
+        with CLASSIFIER_STAGE_SECONDS.time('decode'):
+            if self.model is not None:
+                image.resized
+            else:
+                # The rule-based classifier works on the size-capped grayscale view
+                image.analysis
+        return image
+    
+    def decode_batch(self, blobs):
+        """Decode several encoded images concurrently.
+        
+        Returns one entry per input, in order: the DecodedImage, or the
+        exception raised while decoding that image.
+        """
+        return list(self._get_decode_pool().map(self._try_decode, blobs))
+    
+    def _try_decode(self, image_bytes):
+        try:
+            return self.decode_image(image_bytes)
+        except Exception as e:
+            return e
+    
+    def _get_decode_pool(self):
+        # cv2.imdecode releases the GIL, so threads decode in parallel
+        if self._decode_pool is None:
+            with self._decode_pool_lock:
+                if self._decode_pool is None:
+                    self._decode_pool = ThreadPoolExecutor(
+                        max_workers=self.decode_threads or os.cpu_count() or 1, thread_name_prefix='decode'
+                    )
+        return self._decode_pool
+    
     def predict(self, image_path):
-        """Classify electrical socket from image"""
+        """Classify electrical socket from an image file on disk"""
+        try:
+            image = self.load_image(image_path)
+        except Exception as e:
+            return self._fallback_result(f'Fallback classification: {str(e)}')
+        
+        return self.predict_image(image)
+    
+    def predict_bytes(self, image_bytes):
+        """Classify electrical socket from encoded image bytes"""
+        try:
+            image = self.load_image(image_bytes)
+        except Exception as e:
+            return self._fallback_result(f'Fallback classification: {str(e)}')
+        
+        return self.predict_image(image)
+    
+    def predict_array(self, image):
+        """Classify electrical socket from a decoded BGR image array"""
         try:
-            # For demonstration purposes, we'll use rule-based classification
-            prediction_result = self._demo_classify(image_path)
+            image = self.load_image(image)
+        except Exception as e:
+            return self._fallback_result(f'Fallback classification: {str(e)}')
+        
+        return self.predict_image(image)
+    
+    def predict_image(self, image):
+        """Classify electrical socket from a DecodedImage"""
+        try:
+            if self.model is not None:
+                try:
+                    return self._model_classify([image])[0]
+                except Exception as e:
+                    prediction_result = self._demo_classify(image)
+                    prediction_result['note'] = f'Rule-based fallback: {str(e)}'
+                    return prediction_result
+            
+            # Rule-based classification
+            prediction_result = self._demo_classify(image)
             
             return prediction_result
             
         except Exception as e:
-            # Fallback classification
-            return {
-                'outlet_type': 'NEMA_5-15R',
-                'confidence': 0.60,
-                'detected_features': {},
-                'note': 'Fallback classification used due to processing error'
-            }
+            return self._fallback_result('Fallback classification used due to processing error')
+    
+    def predict_batch(self, images):
+        """Classify a list of DecodedImages, returning results in order"""
+        if not images:
+            return []
+        
+        if self.model is not None:
+            try:
+                # One forward pass over the whole stacked batch
+                return self._model_classify(images)
+            except Exception as e:
+                print(f"Batched inference failed, classifying images one by one: {e}")
+        
+        # The rule-based demo inspects each full-resolution image on its own
+        return [self.predict_image(image) for image in images]
+    
+    def _model_classify(self, images):
+        """Run the inference engine over a list of DecodedImages"""
+        model = self.model
+        if model is None:
+            # Another thread switched to rules after this call checked for a model
+            raise ModelLoadError("No model is loaded")
+        with CLASSIFIER_STAGE_SECONDS.time('preprocess'):
+            batch = self.preprocess_batch(images)
+        with CLASSIFIER_STAGE_SECONDS.time('forward'):
+            try:
+                results = model.predict(batch)
+            except ModelLoadError as e:
+                # Loading is not retried, so stop asking the model
+                self.use_rules(e)
+                raise
+        for image, result in zip(images, results):
+            width, height = image.size
+            result['detected_features'] = {'image_size': f"{width}x{height}"}
+        return results
     
-    def _demo_classify(self, image_path):
+    def _fallback_result(self, note):
+        """Default result returned when an image cannot be analysed"""
+        return {
+            'outlet_type': 'NEMA_5-15R',
+            'confidence': 0.60,
+            'detected_features': {},
+            'note': note
+        }
+    
+    def _demo_classify(self, image):
         """Demo classification based on simple image analysis"""
         try:
-            # Load image for analysis
-            image = cv2.imread(image_path)
-            if image is None:
-                raise Exception("Could not load image")
-                
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = image.analysis
             
-            # Simple feature extraction for demo
-            height, width = gray.shape
+            # Simple feature extraction for demo; sizes refer to the original image
+            width, height = image.size
             aspect_ratio = width / height
             
             # Count contours (holes in socket)
-            _, thresh = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            with CLASSIFIER_STAGE_SECONDS.time('contours'):
+                _, thresh = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
+                contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
             # Demo logic - this would be replaced by actual ML model
             if len(contours) >= 3:
@@ -114,12 +274,7 @@ class ElectricalSocketClassifier:
             
         except Exception as e:
             # Fallback classification
-            return {
-                'outlet_type': 'NEMA_5-15R',
-                'confidence': 0.60,
-                'detected_features': {},
-                'note': f'Fallback classification: {str(e)}'
-            }
+            return self._fallback_result(f'Fallback classification: {str(e)}')
     
     def get_supported_types(self):
         """Get list of supported socket types"""
@@ -128,4 +283,8 @@ class ElectricalSocketClassifier:
     def train_model(self, train_data_path):
         """Train the model (placeholder for future implementation)"""
         print("Model training not implemented in this demo version")
-        pass 
\ No newline at end of file
+        pass 
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
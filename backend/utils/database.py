@@ -1,15 +1,96 @@
 import sqlite3
 import json
 import os
+import threading
+import time
+from .metrics import metrics, timed
+
+# Hot-path queries are module constants so each connection's statement
+# cache (keyed by SQL text) hands back the already-prepared statement
+PRODUCT_BY_TYPE_SQL = 'SELECT * FROM outlets WHERE outlet_type = ?'
+PRODUCT_SPECS_SQL = '''
+    SELECT os.*, o.name, o.description 
+    FROM outlet_specifications os
+    JOIN outlets o ON os.outlet_type = o.outlet_type
+    WHERE os.outlet_type = ?
+'''
+ALL_PRODUCTS_SQL = 'SELECT * FROM outlets ORDER BY id'
+ALL_PRODUCT_SPECS_SQL = '''
+    SELECT os.*, o.name, o.description 
+    FROM outlet_specifications os
+    JOIN outlets o ON os.outlet_type = o.outlet_type
+    ORDER BY os.id
+'''
+ALL_OUTLET_TYPES_SQL = 'SELECT outlet_type, name FROM outlets ORDER BY name'
+CATALOG_VERSION_SQL = 'SELECT version FROM catalog_meta WHERE id = 1'
+BUMP_CATALOG_VERSION_SQL = 'UPDATE catalog_meta SET version = version + 1 WHERE id = 1'
+
+CONNECTION_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-8192',      # 8 MB page cache
+    'PRAGMA mmap_size=67108864',    # 64 MB memory-mapped reads
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA busy_timeout=5000'
+]
+
+DB_LOOKUP_SECONDS = metrics.histogram(
+    'outlet_db_lookup_seconds', 'Time spent in catalog lookups', ['method']
+)
+
+class ThreadConnections:
+    """One tuned SQLite connection per thread, opened on first use.
+
+    Connections are tagged with the process that opened them, so a forked
+    worker opens its own instead of reusing its parent's.
+    """
+
+    def __init__(self, db_path, pragmas=CONNECTION_PRAGMAS, cached_statements=64):
+        self.db_path = db_path
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+
+    def get(self):
+        """Get this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, cached_statements=self.cached_statements)
+            for pragma in self.pragmas:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
 
 class Database:
-    def __init__(self, db_path='data/outlets.db'):
+    def __init__(self, db_path='data/outlets.db', catalog_check_interval=1.0):
         self.db_path = db_path
+        # Seconds a loaded catalog is served before the version is checked again
+        self.catalog_check_interval = catalog_check_interval
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connections = ThreadConnections(db_path)
+        self._catalog = None
+        self._catalog_version = None
+        self._catalog_checked_at = None
+        self._catalog_lock = threading.Lock()
+    
+    def _connect(self):
+        return self._connections.get()
+    
+    def close(self):
+        """Close the calling thread's connection"""
+        self._connections.close()
     
     def initialize(self):
         """Initialize database with tables and sample data"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Create outlets table
@@ -44,11 +125,21 @@ class Database:
             )
         ''')
         
+        # Version counter for the in-memory catalog cache
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS catalog_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('INSERT OR IGNORE INTO catalog_meta (id, version) VALUES (1, 0)')
+        
         # Insert sample data
         self._insert_sample_data(cursor)
+        cursor.execute(BUMP_CATALOG_VERSION_SQL)
         
         conn.commit()
-        conn.close()
+        self._catalog_checked_at = None
         print("Database initialized successfully")
     
     def _insert_sample_data(self, cursor):
@@ -104,81 +195,131 @@ class Database:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', specs_data)
     
+    @timed(DB_LOOKUP_SECONDS, 'get_product_by_type')
     def get_product_by_type(self, outlet_type):
         """Get product information by socket type"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        catalog = self._get_catalog()
+        if catalog is None:
+            result = self._connect().execute(PRODUCT_BY_TYPE_SQL, (outlet_type,)).fetchone()
+            return self._product_from_row(result) if result else None
         
-        cursor.execute('''
-            SELECT * FROM outlets WHERE outlet_type = ?
-        ''', (outlet_type,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return {
-                'id': result[0],
-                'outlet_type': result[1],
-                'name': result[2],
-                'description': result[3],
-                'country_code': result[4],
-                'voltage': result[5],
-                'current_rating': result[6],
-                'frequency': result[7],
-                'plug_type': result[8],
-                'natural_image_url': result[9],
-                'product_image_url': result[10]
-            }
-        return None
+        product = catalog['products'].get(outlet_type)
+        return dict(product) if product else None
     
+    @timed(DB_LOOKUP_SECONDS, 'get_product_specs')
     def get_product_specs(self, outlet_type):
         """Get detailed specifications for socket type"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        catalog = self._get_catalog()
+        if catalog is None:
+            result = self._connect().execute(PRODUCT_SPECS_SQL, (outlet_type,)).fetchone()
+            return self._specs_from_row(result) if result else None
         
-        cursor.execute('''
-            SELECT os.*, o.name, o.description 
-            FROM outlet_specifications os
-            JOIN outlets o ON os.outlet_type = o.outlet_type
-            WHERE os.outlet_type = ?
-        ''', (outlet_type,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            geometry_data = json.loads(result[8]) if result[8] else {}
-            return {
-                'outlet_type': result[1],
-                'dimensions': {
-                    'width': result[2],
-                    'height': result[3],
-                    'depth': result[4]
-                },
-                'hole_diameter': result[5],
-                'hole_spacing': result[6],
-                'mounting_screws': result[7],
-                'geometry_data': geometry_data,
-                'name': result[9],
-                'description': result[10]
-            }
-        return None
+        specs = catalog['specs'].get(outlet_type)
+        if specs is None:
+            return None
+        # geometry_data is shared with the cache and must be treated as read-only
+        return dict(specs, dimensions=dict(specs['dimensions']))
     
+    @timed(DB_LOOKUP_SECONDS, 'get_all_outlet_types')
     def get_all_outlet_types(self):
         """Get all supported socket types"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        catalog = self._get_catalog()
+        if catalog is None:
+            results = self._connect().execute(ALL_OUTLET_TYPES_SQL).fetchall()
+            return [{'type': row[0], 'name': row[1]} for row in results]
+        
+        return [dict(entry) for entry in catalog['outlet_types']]
+    
+    def _get_catalog(self):
+        """Get the in-memory catalog, reloading it if another writer bumped the version.
+        
+        The version is read at most once per catalog_check_interval, so
+        lookups in between never touch SQLite and writes from other
+        processes show up within that interval. Returns None when the
+        database predates the catalog_meta table, in which case callers
+        query SQLite directly.
+        """
+        checked_at = self._catalog_checked_at
+        now = time.monotonic()
+        if self._catalog is not None and checked_at is not None and now - checked_at < self.catalog_check_interval:
+            return self._catalog
+        
+        version = self._read_catalog_version()
+        if version is None:
+            return None
+        
+        if self._catalog is None or self._catalog_version != version:
+            with self._catalog_lock:
+                if self._catalog is None or self._catalog_version != version:
+                    # The version is read before the tables, so a concurrent write
+                    # at worst causes one extra reload on the next lookup
+                    self._catalog = self._load_catalog()
+                    self._catalog_version = version
+        self._catalog_checked_at = now
+        return self._catalog
+    
+    def _read_catalog_version(self):
+        try:
+            row = self._connect().execute(CATALOG_VERSION_SQL).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+    
+    def _load_catalog(self):
+        """Load both catalog tables into memory, keyed by outlet_type"""
+        conn = self._connect()
+        
+        products = {}
+        for row in conn.execute(ALL_PRODUCTS_SQL):
+            products[row[1]] = self._product_from_row(row)
         
-        cursor.execute('SELECT outlet_type, name FROM outlets ORDER BY name')
-        results = cursor.fetchall()
-        conn.close()
+        specs = {}
+        for row in conn.execute(ALL_PRODUCT_SPECS_SQL):
+            # Match the direct query, which returns the first specification row
+            if row[1] not in specs:
+                specs[row[1]] = self._specs_from_row(row)
         
-        return [{'type': row[0], 'name': row[1]} for row in results]
+        outlet_types = [{'type': outlet_type, 'name': product['name']}
+                        for outlet_type, product in products.items()]
+        outlet_types.sort(key=lambda entry: entry['name'])
+        
+        return {'products': products, 'specs': specs, 'outlet_types': outlet_types}
+    
+    def _product_from_row(self, result):
+        return {
+            'id': result[0],
+            'outlet_type': result[1],
+            'name': result[2],
+            'description': result[3],
+            'country_code': result[4],
+            'voltage': result[5],
+            'current_rating': result[6],
+            'frequency': result[7],
+            'plug_type': result[8],
+            'natural_image_url': result[9],
+            'product_image_url': result[10]
+        }
+    
+    def _specs_from_row(self, result):
+        geometry_data = json.loads(result[8]) if result[8] else {}
+        return {
+            'outlet_type': result[1],
+            'dimensions': {
+                'width': result[2],
+                'height': result[3],
+                'depth': result[4]
+            },
+            'hole_diameter': result[5],
+            'hole_spacing': result[6],
+            'mounting_screws': result[7],
+            'geometry_data': geometry_data,
+            'name': result[9],
+            'description': result[10]
+        }
     
     def add_outlet_type(self, outlet_data, specs_data):
         """Add new socket type to database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -196,11 +337,14 @@ class Database:
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', specs_data)
             
+            # Tell every process holding a catalog cache to reload it
+            cursor.execute(BUMP_CATALOG_VERSION_SQL)
+            
             conn.commit()
+            # This process sees its own write on the next lookup
+            self._catalog_checked_at = None
             return True
         except Exception as e:
             conn.rollback()
             print(f"Error adding socket type: {e}")
-            return False
-        finally:
-            conn.close() 
\ No newline at end of file
+            return False 
\ No newline at end of file
@@ -0,0 +1,182 @@
+import numpy as np
+from PIL import Image
+import cv2
+import io
+
+# JPEG decoders can scale by 1/2, 1/4 or 1/8 while decoding, which is far
+# cheaper than decoding at full size and shrinking afterwards
+REDUCED_COLOR_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+]
+REDUCED_GRAYSCALE_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+    (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+    (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)
+]
+
+EXIF_ORIENTATION = 0x0112
+
+class ImageTooLarge(Exception):
+    pass
+
+class DecodedImage:
+    """A single decode of one image, with derived views computed on demand.
+
+    The full-resolution BGR buffer is decoded at most once and shared by the
+    grayscale and resized views. When only the model-sized view or the
+    size-capped analysis view is needed, the image is decoded at a reduced
+    scale and the full image is never decoded.
+
+    Dimensions are read from the header first; images with more than
+    max_pixels pixels, or whose header cannot be read, are refused before
+    any decoding.
+    """
+
+    def __init__(self, data=None, bgr=None, gray=None, resized=None, analysis=None, size=None,
+                 target_size=(224, 224), max_analysis_size=None, max_pixels=None):
+        if data is None and bgr is None and gray is None and resized is None and analysis is None:
+            raise ValueError("DecodedImage needs encoded data or a decoded array")
+        self._data = data
+        self._bgr = bgr
+        # Views may also be supplied precomputed, e.g. when handed to another process
+        self._size = size
+        self._gray = gray
+        self._resized = resized
+        self._analysis = analysis
+        self._normalized = None
+        self.target_size = target_size  # (width, height)
+        self.max_analysis_size = max_analysis_size  # longest side of the analysis view
+        self.max_pixels = max_pixels
+
+    @classmethod
+    def from_bytes(cls, data, target_size=(224, 224), **options):
+        if not data:
+            raise Exception("Empty image data")
+        return cls(data=data, target_size=target_size, **options)
+
+    @classmethod
+    def from_array(cls, bgr, target_size=(224, 224), **options):
+        if bgr is None:
+            raise Exception("Could not load image")
+        return cls(bgr=bgr, target_size=target_size, **options)
+
+    @classmethod
+    def from_path(cls, image_path, target_size=(224, 224), **options):
+        with open(image_path, 'rb') as f:
+            return cls.from_bytes(f.read(), target_size, **options)
+
+    @property
+    def size(self):
+        """Original (width, height), read from the header when not yet decoded"""
+        if self._size is None:
+            if self._bgr is not None:
+                self._size = (self._bgr.shape[1], self._bgr.shape[0])
+            elif self._gray is not None:
+                self._size = (self._gray.shape[1], self._gray.shape[0])
+            elif self._data is None:
+                # Only downscaled views were supplied, so the original size is unknown
+                view = self._analysis if self._analysis is not None else self._resized
+                self._size = (view.shape[1], view.shape[0])
+            else:
+                self._size = self._header_size()
+                if self._size is None:
+                    self._size = (self.bgr.shape[1], self.bgr.shape[0])
+        return self._size
+
+    @property
+    def bgr(self):
+        """Full-resolution uint8 BGR buffer"""
+        if self._bgr is None:
+            self._bgr = self._decode(cv2.IMREAD_COLOR)
+        return self._bgr
+
+    @property
+    def gray(self):
+        """uint8 grayscale view of the full-resolution image"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def resized(self):
+        """uint8 RGB image at target_size"""
+        if self._resized is None:
+            source = self._bgr if self._bgr is not None else self._decode_reduced(min(self.target_size), max(self.target_size))
+            resized = cv2.resize(source, self.target_size, interpolation=cv2.INTER_AREA)
+            self._resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        return self._resized
+
+    @property
+    def analysis(self):
+        """uint8 grayscale view whose longest side is at most max_analysis_size"""
+        if self._analysis is None:
+            limit = self.max_analysis_size
+            if not limit or max(self.size) <= limit:
+                self._analysis = self.gray
+            else:
+                if self._gray is not None or self._bgr is not None or self._data is None:
+                    source = self.gray
+                else:
+                    source = self._decode_reduced(0, limit, grayscale=True)
+                height, width = source.shape[:2]
+                scale = limit / max(width, height)
+                if scale < 1.0:
+                    source = cv2.resize(source, (max(1, round(width * scale)), max(1, round(height * scale))),
+                                        interpolation=cv2.INTER_AREA)
+                self._analysis = source
+        return self._analysis
+
+    @property
+    def normalized(self):
+        """float32 RGB image at target_size scaled to [0, 1]"""
+        if self._normalized is None:
+            self._normalized = self.resized.astype(np.float32) * (1.0 / 255.0)
+        return self._normalized
+
+    def _decode(self, flags):
+        if self._data is None:
+            raise Exception("Full-resolution image is not available")
+        self._check_pixels()
+        image = cv2.imdecode(np.frombuffer(self._data, dtype=np.uint8), flags)
+        if image is None:
+            raise Exception("Could not decode image")
+        return image
+
+    def _decode_reduced(self, min_short_side, min_long_side, grayscale=False):
+        """Decode at the smallest scale whose short and long sides still cover the minimums"""
+        short_side, long_side = sorted(self.size)
+        for factor, flags in (REDUCED_GRAYSCALE_FLAGS if grayscale else REDUCED_COLOR_FLAGS):
+            if short_side // factor >= min_short_side and long_side // factor >= min_long_side:
+                return self._decode(flags)
+        return self.gray if grayscale else self.bgr
+
+    def _header_size(self):
+        """(width, height) from the encoded header, or None if it cannot be parsed"""
+        try:
+            with Image.open(io.BytesIO(self._data)) as header:
+                width, height = header.size
+                # The decoder applies EXIF rotation, so report the size as decoded
+                if header.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+                    return (height, width)
+                return (width, height)
+        except Image.DecompressionBombError as e:
+            # PIL refuses to even open images far beyond its own pixel limit
+            raise ImageTooLarge(f"Image is too large; {e}")
+        except Exception:
+            return None
+
+    def _check_pixels(self):
+        if not self.max_pixels:
+            return
+        if self._size is None:
+            self._size = self._header_size()
+        if self._size is None:
+            # Without a size there is no way to bound the decode
+            raise Exception("Could not read image dimensions")
+        width, height = self._size
+        if width * height > self.max_pixels:
+            raise ImageTooLarge(
+                f"Image is too large ({width}x{height}); at most {self.max_pixels} pixels are supported"
+            )
@@ -0,0 +1,112 @@
+import numpy as np
+import importlib.util
+import os
+import threading
+
+class ModelLoadError(Exception):
+    """Raised by OnnxEngine when the inference session cannot be created"""
+
+class OnnxEngine:
+    """CPU inference over an exported ONNX classification model.
+
+    The session is created lazily, once per process, so a pre-forking server
+    does not share ONNX Runtime thread pools across fork(). onnxruntime itself
+    is only imported there too: a process that forks after importing it can
+    hang or abort when the child exits.
+    """
+
+    name = 'onnx'
+
+    def __init__(self, model_path, class_names, intra_op_threads=None, inter_op_threads=1, top_k=3):
+        # optional: only needed for the ONNX engine
+        if importlib.util.find_spec('onnxruntime') is None:
+            raise ImportError("onnxruntime is not installed")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX model not found: {model_path}")
+
+        self.model_path = model_path
+        self.class_names = list(class_names)
+        self.intra_op_threads = intra_op_threads or os.cpu_count() or 1
+        self.inter_op_threads = inter_op_threads
+        self.top_k = min(top_k, len(self.class_names))
+        self._session = None
+        self._session_pid = None
+        self._load_error = None  # a failed load is not retried within the process
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._load_error is not None and self._session_pid == os.getpid():
+                    raise self._load_error
+                if self._session is None or self._session_pid != os.getpid():
+                    try:
+                        self._session = self._create_session()
+                    except Exception as e:
+                        self._session = None
+                        self._load_error = ModelLoadError(f"Could not load {self.model_path}: {e}")
+                        self._session_pid = os.getpid()
+                        raise self._load_error
+                    self._load_error = None
+                    self._session_pid = os.getpid()
+                    print(f"ONNX model loaded: {self.model_path}")
+        return self._session
+
+    def _create_session(self):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return onnxruntime.InferenceSession(
+            self.model_path, sess_options=options, providers=['CPUExecutionProvider']
+        )
+
+    def load(self):
+        """Create the inference session now instead of on the first request"""
+        self._get_session()
+
+    def predict(self, batch):
+        """Run one forward pass over an (N, H, W, 3) float32 batch.
+
+        Returns one result per image with the top class, its confidence and
+        the top-k scores.
+        """
+        session = self._get_session()
+        model_input = session.get_inputs()[0]
+
+        # Models exported from PyTorch usually expect channels-first input
+        if len(model_input.shape) == 4 and model_input.shape[1] == 3:
+            batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+
+        scores = session.run(None, {model_input.name: batch})[0]
+        scores = scores.reshape(len(batch), -1)
+        if scores.shape[1] != len(self.class_names):
+            raise ValueError(f"Model returned {scores.shape[1]} scores for {len(self.class_names)} classes")
+
+        probabilities = softmax(scores) if not _is_probability(scores) else scores
+        top = np.argsort(-probabilities, axis=1)[:, :self.top_k]
+
+        results = []
+        for row, indices in zip(probabilities, top):
+            results.append({
+                'outlet_type': self.class_names[indices[0]],
+                'confidence': float(row[indices[0]]),
+                'top_k': [
+                    {'outlet_type': self.class_names[i], 'score': float(row[i])}
+                    for i in indices
+                ]
+            })
+        return results
+
+def softmax(logits):
+    """Row-wise softmax, stable against large logits"""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def _is_probability(scores):
+    # Some exports already end in a softmax layer
+    return bool(np.all(scores >= 0) and np.allclose(scores.sum(axis=1), 1.0, atol=1e-3))
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from .database import ThreadConnections
+from .metrics import metrics
+
+JOB_SECONDS = metrics.histogram(
+    'outlet_job_seconds', 'Time background jobs spend queued and running', ['kind', 'phase']
+)
+JOBS_TOTAL = metrics.counter('outlet_jobs_total', 'Background jobs finished', ['kind', 'status'])
+
+class QueueFull(Exception):
+    """Raised by JobManager.submit when max_pending jobs are already queued or running"""
+
+class JobManager:
+    """Run slow work on a background thread pool and track it by job id.
+
+    Job state lives in SQLite rather than in memory so that any web worker
+    process can answer a status poll, not just the one that accepted the job.
+    """
+
+    def __init__(self, db_path='data/jobs.db', max_workers=None, ttl=3600, max_pending=None,
+                 prune_interval=60):
+        self.db_path = db_path
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 2)
+        self.ttl = ttl  # seconds a finished job is kept around for polling
+        self.max_pending = max_pending  # per process; None means unbounded
+        self.prune_interval = prune_interval  # seconds between sweeps of expired jobs
+        self._next_prune = 0.0
+        self._connections = ThreadConnections(db_path)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = {}  # dedupe key -> job id of the queued or running job
+        self._pending_lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._create_table()
+
+    def _create_table(self):
+        """Create the jobs table if it does not exist yet"""
+        conn = self._connections.get()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress REAL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        # Covers the expiry sweep in _create_job
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at)')
+        conn.commit()
+        # The creating thread may never run jobs, e.g. a pre-forking server's master
+        self._connections.close()
+
+    def _get_executor(self):
+        # Created on first use so no threads exist before a pre-forking server forks
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='job'
+                    )
+        return self._executor
+
+    def submit(self, kind, fn, *args, key=None):
+        """Queue fn(progress, *args) and return the new job id.
+
+        If key is given and a job with the same key is still queued or
+        running in this process, that job's id is returned instead.
+        """
+        with self._pending_lock:
+            if key is not None and key in self._in_flight:
+                return self._in_flight[key]
+            if self.max_pending is not None and self._pending >= self.max_pending:
+                raise QueueFull(f"{self._pending} jobs are already pending")
+            job_id = uuid.uuid4().hex
+            self._pending += 1
+            if key is not None:
+                self._in_flight[key] = job_id
+
+        try:
+            self._create_job(job_id, kind)
+            self._get_executor().submit(self._run, job_id, kind, time.perf_counter(), fn, args, key)
+        except BaseException:
+            self._finish(key)
+            raise
+        return job_id
+
+    def pending(self):
+        """Jobs queued or running in this process"""
+        with self._pending_lock:
+            return self._pending
+
+    def _finish(self, key):
+        with self._pending_lock:
+            self._pending -= 1
+            if key is not None:
+                self._in_flight.pop(key, None)
+
+    def _create_job(self, job_id, kind):
+        now = time.time()
+
+        conn = self._connections.get()
+        with conn:
+            # Expired jobs are swept at most once per prune_interval
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                conn.execute('DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?',
+                             ('completed', 'failed', now - self.ttl))
+            conn.execute('''
+                INSERT INTO jobs (id, kind, status, stage, progress, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, kind, 'queued', 'queued', 0.0, now, now))
+
+    def _run(self, job_id, kind, queued_at, fn, args, key):
+        """Execute a job and record its outcome"""
+        def progress(stage, fraction):
+            self._update(job_id, status='running', stage=stage, progress=fraction)
+
+        started = time.perf_counter()
+        JOB_SECONDS.observe(started - queued_at, kind, 'queued')
+        try:
+            result = fn(progress, *args)
+            with JOB_SECONDS.time(kind, 'store_result'):
+                self._update(job_id, status='completed', stage='done', progress=1.0,
+                             result=json.dumps(result))
+            status = 'completed'
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self._update(job_id, status='failed', stage='failed', error=str(e))
+            status = 'failed'
+        finally:
+            self._finish(key)
+        JOB_SECONDS.observe(time.perf_counter() - started, kind, 'run')
+        JOBS_TOTAL.inc(kind, status)
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f'{name} = ?' for name in fields)
+
+        conn = self._connections.get()
+        with conn:
+            conn.execute(f'UPDATE jobs SET {columns} WHERE id = ?',
+                         list(fields.values()) + [job_id])
+
+    def get(self, job_id):
+        """Get the current state of a job, or None if it is unknown"""
+        row = self._connections.get().execute('''
+            SELECT id, kind, status, stage, progress, result, error, created_at, updated_at
+            FROM jobs WHERE id = ?
+        ''', (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        job = {
+            'job_id': row[0],
+            'kind': row[1],
+            'status': row[2],
+            'stage': row[3],
+            'progress': row[4],
+            'created_at': row[7],
+            'updated_at': row[8]
+        }
+        if row[5] is not None:
+            job['result'] = json.loads(row[5])
+        if row[6] is not None:
+            job['error'] = row[6]
+        return job
@@ -0,0 +1,46 @@
+import threading
+
+class LazyComponent:
+    """Build an expensive object on first use, or ahead of time on a background thread.
+
+    Lets the app import without pulling in heavy dependencies (OpenCV, NumPy,
+    model runtimes) until they are needed, while reporting whether the
+    component is ready yet.
+    """
+
+    def __init__(self, factory, name):
+        self.factory = factory
+        self.name = name
+        self._value = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def get(self):
+        """The component, building it on the calling thread if necessary"""
+        if not self._ready.is_set():
+            with self._lock:
+                if not self._ready.is_set():
+                    self._value = self.factory()
+                    self._ready.set()
+        return self._value
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def peek(self):
+        """The component if it has been built, else None; never builds it"""
+        return self._value if self._ready.is_set() else None
+
+    def warm_in_background(self):
+        """Start building the component on a daemon thread"""
+        thread = threading.Thread(target=self._warm, name=f'warm-{self.name}', daemon=True)
+        thread.start()
+        return thread
+
+    def _warm(self):
+        try:
+            self.get()
+        except Exception as e:
+            # The next get() retries and raises to its caller
+            print(f"Warming {self.name} failed: {e}")
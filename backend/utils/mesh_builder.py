@@ -0,0 +1,191 @@
+import numpy as np
+
+# Vertices closer than this (mm) are treated as the same point
+WELD_TOLERANCE = 1e-6
+
+class MeshBuilder:
+    """Merge mesh parts into one compact indexed mesh.
+
+    Parts are added as separate (vertices, faces) arrays. build() welds
+    coincident vertices on a hashed grid, drops triangles that collapse
+    when welded, keeps one copy of repeated triangles and removes pairs of
+    coincident, opposite-facing triangles, i.e. the internal walls left
+    where two closed parts touch. Parts that only touch are joined into one
+    shell this way; parts that overlap would need a boolean union, which
+    this does not attempt.
+    """
+
+    def __init__(self, tolerance=WELD_TOLERANCE):
+        self.tolerance = tolerance
+        self._vertices = []
+        self._faces = []
+        self._vertex_count = 0
+
+    def add(self, vertices, faces):
+        """Add a part; faces index into this part's own vertices"""
+        self._vertices.append(np.asarray(vertices, dtype=np.float64))
+        self._faces.append(np.asarray(faces, dtype=np.intp) + self._vertex_count)
+        self._vertex_count += len(vertices)
+        return self
+
+    def build(self):
+        """The merged (vertices, faces)"""
+        if not self._vertices:
+            return np.empty((0, 3)), np.empty((0, 3), dtype=np.intp)
+        vertices, faces = weld_vertices(np.concatenate(self._vertices), np.concatenate(self._faces), self.tolerance)
+        return vertices, remove_duplicate_faces(faces)
+
+def weld_vertices(vertices, faces, tolerance=WELD_TOLERANCE):
+    """Merge vertices closer than tolerance, returning compact (vertices, faces).
+
+    Vertices are hashed by their cell on a grid of the given spacing, so
+    welding is a single sort rather than a pairwise search. Faces that
+    collapse to a line or point after welding are dropped.
+    """
+    quantized = np.round(np.asarray(vertices, dtype=np.float64) / tolerance).astype(np.int64)
+    _, first, inverse = np.unique(_row_keys(quantized), return_index=True, return_inverse=True)
+    faces = inverse.reshape(-1)[faces]
+    degenerate = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 0] == faces[:, 2])
+    return vertices[first], faces[~degenerate]
+
+def remove_duplicate_faces(faces):
+    """Drop repeated triangles and cancel coincident opposite-facing pairs, keeping face order"""
+    if len(faces) == 0:
+        return faces
+
+    # Triangles over the same three vertices share a sorted key; an even
+    # permutation of the sorted order means the same winding
+    ordered = np.sort(faces, axis=1)
+    rotations = (faces == ordered[:, [0]]).argmax(axis=1)
+    winding = np.where(faces[np.arange(len(faces)), (rotations + 1) % 3] == ordered[:, 1], 1, -1)
+
+    _, group = np.unique(_face_keys(ordered), return_inverse=True)
+    group = group.reshape(-1)
+    net = np.bincount(group, weights=winding).astype(np.int64)
+
+    # Keep the first face of each group whose winding matches the net winding
+    keep = np.zeros(len(faces), dtype=bool)
+    candidates = np.flatnonzero(winding == np.sign(net)[group])
+    _, first_candidate = np.unique(group[candidates], return_index=True)
+    keep[candidates[first_candidate]] = True
+    return faces[keep]
+
+def _face_keys(ordered):
+    # Pack each sorted index triple into one integer so grouping is a 1-D sort
+    n = int(ordered.max()) + 1
+    if n ** 3 < 2 ** 63:
+        return (ordered[:, 0].astype(np.int64) * n + ordered[:, 1]) * n + ordered[:, 2]
+    return _row_keys(ordered)
+
+def _row_keys(array):
+    # View each int64 row as one opaque value: a 1-D unique over these is
+    # much faster than np.unique(axis=0), and only equality matters here
+    array = np.ascontiguousarray(array, dtype=np.int64)
+    return array.view(np.dtype((np.void, array.dtype.itemsize * array.shape[1]))).reshape(-1)
+
+def is_watertight(faces):
+    """True if every edge is shared by exactly two triangles with opposite windings"""
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    directed = np.unique(edges, axis=0)
+    if len(directed) != len(edges):
+        return False
+    return np.array_equal(directed, np.unique(edges[:, ::-1], axis=0))
+
+def triangulate_polygon(outer, holes=()):
+    """Triangulate a 2D polygon with holes by ear clipping.
+
+    outer is an (N, 2) counter-clockwise ring and each hole a clockwise ring
+    strictly inside it. Each hole is joined to the outer ring by a bridge
+    edge, then ears are clipped from the resulting single ring. Returns an
+    (M, 3) array of counter-clockwise triangles indexing the rings
+    concatenated in order (outer first).
+    """
+    rings = [np.asarray(outer, dtype=np.float64)] + [np.asarray(hole, dtype=np.float64) for hole in holes]
+    points = np.concatenate(rings)
+
+    ring = list(range(len(rings[0])))
+    hole_rings = []
+    start = len(rings[0])
+    for hole in rings[1:]:
+        hole_rings.append(list(range(start, start + len(hole))))
+        start += len(hole)
+
+    # Bridging the rightmost holes first keeps the bridges short and clear of each other
+    hole_rings.sort(key=lambda hole: -points[hole, 0].max())
+    for i, hole in enumerate(hole_rings):
+        ring = _bridge_hole(points, ring, hole, hole_rings[i + 1:])
+
+    return np.array(_clip_ears(points, ring), dtype=np.intp).reshape(-1, 3)
+
+def _cross(o, a, b):
+    return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (a[..., 1] - o[..., 1]) * (b[..., 0] - o[..., 0])
+
+def _ring_edges(points, rings):
+    starts = np.concatenate([ring for ring in rings])
+    ends = np.concatenate([np.roll(ring, -1) for ring in rings])
+    return points[starts], points[ends]
+
+def _locally_inside(points, ring, position, target):
+    """Whether the direction from ring[position] to target leaves into the polygon interior"""
+    a = points[ring[position - 1]]
+    v = points[ring[position]]
+    b = points[ring[(position + 1) % len(ring)]]
+    if _cross(a, v, b) > 0:
+        return _cross(v, b, target) >= 0 and _cross(v, target, a) >= 0
+    return _cross(v, b, target) >= 0 or _cross(v, target, a) >= 0
+
+def _bridge_hole(points, ring, hole, remaining_holes):
+    """Splice hole into ring through a bridge from its rightmost vertex to a visible ring vertex"""
+    start = int(np.argmax(points[hole, 0]))
+    hole = hole[start:] + hole[:start]
+    m = points[hole[0]]
+
+    edge_starts, edge_ends = _ring_edges(points, [ring, hole] + remaining_holes)
+    ring_points = points[ring]
+    for position in np.argsort(np.linalg.norm(ring_points - m, axis=1), kind='stable'):
+        p = ring_points[position]
+        if not (_locally_inside(points, ring, position, m) and _locally_inside(points, hole, 0, p)):
+            continue
+
+        # Edges that share an endpoint with the bridge cannot block it
+        touching = (np.all(edge_starts == m, axis=1) | np.all(edge_ends == m, axis=1) |
+                    np.all(edge_starts == p, axis=1) | np.all(edge_ends == p, axis=1))
+        crosses = ((_cross(m, p, edge_starts) * _cross(m, p, edge_ends) < 0) &
+                   (_cross(edge_starts, edge_ends, m) * _cross(edge_starts, edge_ends, p) < 0))
+        if not np.any(crosses & ~touching):
+            return ring[:position + 1] + hole + [hole[0]] + ring[position:]
+
+    raise ValueError("No bridge found for polygon hole")
+
+def _clip_ears(points, ring):
+    triangles = []
+    ring = list(ring)
+    position = 0
+    attempts = 0
+    while len(ring) > 3:
+        count = len(ring)
+        position %= count
+        a, b, c = ring[position - 1], ring[position], ring[(position + 1) % count]
+        if _is_ear(points, ring, a, b, c):
+            triangles.append((a, b, c))
+            del ring[position]
+            attempts = 0
+        else:
+            position += 1
+            attempts += 1
+            if attempts > count:
+                raise ValueError("Polygon could not be triangulated")
+    triangles.append(tuple(ring))
+    return triangles
+
+def _is_ear(points, ring, a, b, c):
+    pa, pb, pc = points[a], points[b], points[c]
+    if _cross(pa, pb, pc) <= 0:
+        return False
+
+    # No other ring vertex may lie inside or on the candidate triangle;
+    # bridge vertices appear twice in the ring, so compare by position
+    others = points[ring]
+    others = others[~(np.all(others == pa, axis=1) | np.all(others == pb, axis=1) | np.all(others == pc, axis=1))]
+    inside = (_cross(pa, pb, others) >= 0) & (_cross(pb, pc, others) >= 0) & (_cross(pc, pa, others) >= 0)
+    return not np.any(inside)
@@ -0,0 +1,222 @@
+import functools
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+# Latency buckets in seconds, from half a millisecond to ten seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _ShardHandle:
+    """Thread-local owner of a shard; freed when its thread exits"""
+
+    __slots__ = ('shard', '__weakref__')
+
+    def __init__(self):
+        self.shard = {}
+
+class _Sharded:
+    """Per-thread storage so the hot path never takes a lock.
+
+    Each thread writes only to its own shard; a scrape sums all shards.
+    When a thread exits its shard is folded into a shared base total, so
+    short-lived threads (e.g. one per request) do not accumulate shards.
+    """
+
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = {}  # id -> shard of each live thread
+        self._base = {}  # totals of exited threads
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        handle = getattr(self._local, 'handle', None)
+        if handle is None:
+            handle = _ShardHandle()
+            with self._lock:
+                self._shards[id(handle.shard)] = handle.shard
+            weakref.finalize(handle, self._retire, handle.shard)
+            self._local.handle = handle
+        return handle.shard
+
+    def _retire(self, shard):
+        with self._lock:
+            self._shards.pop(id(shard), None)
+            for labelvalues, value in shard.items():
+                total = self._base.get(labelvalues)
+                # Replaced rather than updated in place, so snapshots never see a partial merge
+                self._base[labelvalues] = value if total is None else self._merge(total, value)
+
+    def _snapshots(self):
+        with self._lock:
+            shards = [self._base] + list(self._shards.values())
+            # dict.copy() is atomic with respect to the owning thread's writes
+            return [shard.copy() for shard in shards]
+
+    def _labels(self, labelvalues, extra=None):
+        pairs = list(zip(self.labelnames, labelvalues))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class Counter(_Sharded):
+    type_name = 'counter'
+
+    @staticmethod
+    def _merge(total, value):
+        return total + value
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def collect(self):
+        totals = {}
+        for shard in self._snapshots():
+            for labelvalues, value in shard.items():
+                totals[labelvalues] = totals.get(labelvalues, 0) + value
+        return [f'{self.name}{self._labels(labels)} {_format(value)}' for labels, value in sorted(totals.items())]
+
+class Histogram(_Sharded):
+    type_name = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    @staticmethod
+    def _merge(total, series):
+        return [a + b for a, b in zip(total, series)]
+
+    def observe(self, value, *labelvalues):
+        shard = self._shard()
+        series = shard.get(labelvalues)
+        if series is None:
+            # Per-bucket counts (last slot is +Inf) followed by the running sum
+            series = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labelvalues):
+        """Context manager observing the elapsed wall time of its block"""
+        return _Timer(self, labelvalues)
+
+    def collect(self):
+        merged = {}
+        for shard in self._snapshots():
+            for labelvalues, series in shard.items():
+                series = list(series)
+                total = merged.get(labelvalues)
+                merged[labelvalues] = series if total is None else [a + b for a, b in zip(total, series)]
+
+        lines = []
+        for labelvalues, series in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format(bound)
+                lines.append(f'{self.name}_bucket{self._labels(labelvalues, ("le", le))} {cumulative}')
+            lines.append(f'{self.name}_sum{self._labels(labelvalues)} {_format(series[-1])}')
+            lines.append(f'{self.name}_count{self._labels(labelvalues)} {cumulative}')
+        return lines
+
+class Gauge:
+    """Value read from a callback at scrape time; the callback may return a
+    number or a dict mapping a single label value to a number."""
+
+    type_name = 'gauge'
+
+    def __init__(self, name, help_text, callback, labelname=None):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        self.labelname = labelname
+
+    def collect(self):
+        value = self.callback()
+        if value is None:
+            return []
+        if isinstance(value, dict):
+            return [f'{self.name}{{{self.labelname}="{_escape(label)}"}} {_format(v)}'
+                    for label, v in sorted(value.items())]
+        return [f'{self.name} {_format(value)}']
+
+class _Timer:
+    __slots__ = ('histogram', 'labelvalues', 'start')
+
+    def __init__(self, histogram, labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+        return False
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, callback, labelname=None):
+        # Re-registering replaces the callback, e.g. when the app is reloaded
+        gauge = Gauge(name, help_text, callback, labelname)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+def timed(histogram, *labelvalues):
+    """Decorator observing each call's wall time in histogram"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(histogram, labelvalues):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+# Process-wide registry shared by the app and the utils modules. Each
+# process (e.g. each gunicorn worker) keeps its own counts.
+metrics = MetricsRegistry()
@@ -0,0 +1,130 @@
+import sqlite3
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from .database import ThreadConnections
+
+class ResultCache:
+    """Bounded LRU + TTL cache of classification results keyed by image content.
+
+    An optional SQLite tier lets several worker processes share hits; the
+    in-process LRU sits in front of it so repeated hits never leave memory.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, shared_db_path=None, max_shared_entries=10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_db_path = shared_db_path
+        self.max_shared_entries = max_shared_entries
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._connections = ThreadConnections(shared_db_path) if shared_db_path else None
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._writes = 0
+
+        if shared_db_path:
+            os.makedirs(os.path.dirname(shared_db_path), exist_ok=True)
+            conn = self._connections.get()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    @staticmethod
+    def key_for(data):
+        """Content hash used as the cache key for raw upload bytes"""
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        result = self._get_shared(key, now)
+
+        with self._lock:
+            if result is None:
+                self._misses += 1
+                return None
+            self._shared_hits += 1
+            self._store(key, result, now + self.ttl)
+        return result
+
+    def _get_shared(self, key, now):
+        if not self.shared_db_path:
+            return None
+        try:
+            row = self._connections.get().execute(
+                'SELECT result FROM result_cache WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Result cache read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, result):
+        """Store a result in memory and, if configured, in the shared tier"""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, result, expires_at)
+            self._writes += 1
+            prune = self._writes % 100 == 0
+
+        if self.shared_db_path:
+            self._set_shared(key, result, expires_at, prune)
+
+    def _store(self, key, result, expires_at):
+        # Caller holds self._lock
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _set_shared(self, key, result, expires_at, prune):
+        conn = self._connections.get()
+        try:
+            conn.execute('INSERT OR REPLACE INTO result_cache (key, result, expires_at) VALUES (?, ?, ?)',
+                         (key, json.dumps(result), expires_at))
+            if prune:
+                # Occasionally drop expired rows and keep the table bounded
+                conn.execute('DELETE FROM result_cache WHERE expires_at <= ?', (time.time(),))
+                conn.execute('''
+                    DELETE FROM result_cache WHERE key NOT IN (
+                        SELECT key FROM result_cache ORDER BY expires_at DESC LIMIT ?
+                    )
+                ''', (self.max_shared_entries,))
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Result cache write failed: {e}")
+
+    def stats(self):
+        """Size and hit-rate statistics for this process"""
+        with self._lock:
+            lookups = self._hits + self._shared_hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'shared': bool(self.shared_db_path),
+                'hits': self._hits,
+                'shared_hits': self._shared_hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits + self._shared_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+# Only text-like assets are worth compressing; images and fonts already are
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.css', '.json', '.map', '.svg', '.txt', '.ico', '.xml'}
+COMPRESS_MIN_BYTES = 1024
+# Files larger than this stay on disk and are sent from there
+MAX_IN_MEMORY_BYTES = 4 * 1024 * 1024
+
+# Create React App fingerprints build output, e.g. static/js/main.8f2c1a3b.js
+# and its source map static/js/main.8f2c1a3b.js.map
+FINGERPRINTED = re.compile(r'^static/.*\.[0-9a-f]{8,}\.(chunk\.)?[a-z0-9]+(\.map)?$')
+
+class StaticAsset:
+    """One file of the build, with its precomputed encodings"""
+
+    def __init__(self, path, full_path, data, mimetype, etag, immutable):
+        self.path = path
+        self.full_path = full_path
+        self.data = data  # None when the file is too large to keep in memory
+        self.mimetype = mimetype
+        self.etag = etag
+        self.immutable = immutable
+        self.encodings = {}  # content-coding -> compressed bytes
+
+    def select(self, accept_encodings):
+        """Pick (content-coding, body) for an Accept-Encoding header; coding is None for identity"""
+        for coding in ('br', 'gzip'):
+            if coding in self.encodings and accept_encodings[coding] > 0:
+                return coding, self.encodings[coding]
+        return None, self.data
+
+class StaticAssets:
+    """In-memory manifest of a built frontend.
+
+    The build directory is read once; lookups then never touch the
+    filesystem. Compressible files get gzip (and brotli, when installed)
+    variants up front, and every file gets a content-hash ETag.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+        if os.path.isdir(root):
+            self._scan()
+
+    def _scan(self):
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                full_path = os.path.join(directory, filename)
+                path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                self.assets[path] = self._load(path, full_path)
+
+        print(f"Static assets loaded: {len(self.assets)} files from {self.root}")
+
+    def _load(self, path, full_path):
+        with open(full_path, 'rb') as f:
+            data = f.read()
+
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        asset = StaticAsset(
+            path, full_path,
+            data if len(data) <= MAX_IN_MEMORY_BYTES else None,
+            mimetype,
+            hashlib.blake2b(data, digest_size=16).hexdigest(),
+            bool(FINGERPRINTED.match(path))
+        )
+
+        extension = os.path.splitext(path)[1].lower()
+        if asset.data is not None and extension in COMPRESSIBLE_EXTENSIONS and len(data) >= COMPRESS_MIN_BYTES:
+            variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['br'] = brotli.compress(data, quality=9)
+            # Keep a variant only when it saves a meaningful amount
+            asset.encodings = {
+                coding: body for coding, body in variants.items() if len(body) < len(data) * 0.9
+            }
+        return asset
+
+    def get(self, path):
+        return self.assets.get(path)
+
+    @property
+    def index(self):
+        return self.assets.get('index.html')
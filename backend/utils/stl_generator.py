@@ -1,234 +1,401 @@
 import numpy as np
-from stl import mesh
-import math
 import json
+import math
+import re
+from functools import lru_cache
+from .stl_writer import write_mesh, OUTPUT_FORMATS, TEXT_FORMATS, DEFAULT_PRECISION
+from .mesh_builder import MeshBuilder, triangulate_polygon
+from .metrics import metrics, timed
+
+STL_STAGE_SECONDS = metrics.histogram(
+    'outlet_stl_stage_seconds', 'Time spent building and writing STL meshes', ['stage']
+)
+
+# Hole tessellation: a fixed segment count unless a chord tolerance is requested
+DEFAULT_HOLE_SEGMENTS = 12
+MIN_HOLE_SEGMENTS = 6
+MAX_HOLE_SEGMENTS = 128
+# Level-of-detail presets: maximum distance (mm) between a hole's true circle and its polygon
+DETAIL_TOLERANCES = {
+    'preview': 0.5,
+    'standard': 0.05,
+    'print': 0.01
+}
+
+# Panel layouts: named arrangements, "RxC" strings or {'rows', 'cols', 'pitch'} dicts.
+# A pitch of None places neighbouring outlets edge to edge.
+ARRANGEMENTS = {
+    'single': {'rows': 1, 'cols': 1, 'pitch': (None, None)},
+    'double': {'rows': 1, 'cols': 2, 'pitch': (None, None)},
+    'triple': {'rows': 1, 'cols': 3, 'pitch': (None, None)},
+    'quad': {'rows': 2, 'cols': 2, 'pitch': (None, None)}
+}
+GRID_PATTERN = re.compile(r'^(\d+)x(\d+)$')
+# Outlet types whose named arrangements stack vertically (one outlet per row)
+STACKED_OUTLET_TYPES = {'USB_A'}
+MAX_PANEL_OUTLETS = 64
+
+# Unit box corners: x/y span [-1, 1], z spans the front face (0) to the back (-1)
+BOX_CORNERS = np.array([
+    [-1, -1, 0],    # 0: bottom-left-front
+    [1, -1, 0],     # 1: bottom-right-front
+    [1, 1, 0],      # 2: top-right-front
+    [-1, 1, 0],     # 3: top-left-front
+    [-1, -1, -1],   # 4: bottom-left-back
+    [1, -1, -1],    # 5: bottom-right-back
+    [1, 1, -1],     # 6: top-right-back
+    [-1, 1, -1]     # 7: top-left-back
+], dtype=np.float64)
+
+BOX_OUTER_FACES = np.array([
+    # Front face (with holes cut out - simplified)
+    [0, 1, 2], [0, 2, 3],
+    # Back face
+    [4, 7, 6], [4, 6, 5],
+    # Left face
+    [0, 3, 7], [0, 7, 4],
+    # Right face
+    [1, 5, 6], [1, 6, 2],
+    # Top face
+    [3, 2, 6], [3, 6, 7],
+    # Bottom face
+    [0, 4, 5], [0, 5, 1]
+], dtype=np.intp)
+
+# Inner cavity faces, on vertices 8-15 that follow the outer box
+BOX_INNER_FACES = np.array([
+    # Inner front face
+    [8, 11, 10], [8, 10, 9],
+    # Inner back face
+    [12, 13, 14], [12, 14, 15],
+    # Inner walls
+    [8, 9, 13], [8, 13, 12],
+    [9, 10, 14], [9, 14, 13],
+    [10, 11, 15], [10, 15, 14],
+    [11, 8, 12], [11, 12, 15]
+], dtype=np.intp)
 
 class STLGenerator:
+    # Bump whenever geometry or file output changes so cached artifacts are not reused
+    VERSION = 6
+    # Exposed on the class so the app can validate request options against it
+    OUTPUT_FORMATS = OUTPUT_FORMATS
+    TEXT_FORMATS = TEXT_FORMATS
+    DEFAULT_PRECISION = DEFAULT_PRECISION
+    
     def __init__(self):
         self.default_wall_thickness = 2.0  # mm
         self.default_depth = 20.0  # mm
     
-    def generate_outlet_stl(self, product_specs, arrangement, custom_options, output_path):
-        """Generate STL file for power outlet"""
+    def generate_outlet_stl(self, product_specs, arrangement, custom_options, output_path,
+                            output_format='stl', precision=DEFAULT_PRECISION):
+        """Generate a mesh file for power outlet in one of OUTPUT_FORMATS.
+        
+        output_path may be a filesystem path or a writable binary file object.
+        """
         try:
-            # Get dimensions and geometry
-            dimensions = product_specs.get('dimensions', {})
-            geometry_data = product_specs.get('geometry_data', {})
-            
-            # Calculate arrangement multipliers
-            arrangement_config = self._get_arrangement_config(arrangement)
-            
-            # Generate mesh based on outlet type
-            outlet_type = product_specs.get('outlet_type', 'NEMA_5-15R')
-            vertices, faces = self._generate_outlet_geometry(
-                outlet_type, dimensions, geometry_data, arrangement_config, custom_options
-            )
-            
-            # Create STL mesh
-            outlet_mesh = mesh.Mesh(np.zeros(len(faces), dtype=mesh.Mesh.dtype))
-            
-            for i, face in enumerate(faces):
-                for j in range(3):
-                    outlet_mesh.vectors[i][j] = vertices[face[j]]
+            vertices, faces = self.build_geometry(product_specs, arrangement, custom_options)
             
-            # Save to file
-            outlet_mesh.save(output_path)
-            
-            print(f"STL file generated successfully: {output_path}")
+            if hasattr(output_path, 'write'):
+                with STL_STAGE_SECONDS.time('write'):
+                    write_mesh(vertices, faces, output_path, output_format, precision)
+            else:
+                with open(output_path, 'wb') as f, STL_STAGE_SECONDS.time('write'):
+                    write_mesh(vertices, faces, f, output_format, precision)
+                print(f"STL file generated successfully: {output_path}")
             return True
             
         except Exception as e:
             print(f"Error generating STL: {e}")
             return False
     
-    def _get_arrangement_config(self, arrangement):
-        """Get configuration for outlet arrangement"""
-        configs = {
-            'single': {'count': 1, 'spacing': 0, 'layout': 'single'},
-            'double': {'count': 2, 'spacing': 80, 'layout': 'horizontal'},
-            'triple': {'count': 3, 'spacing': 60, 'layout': 'horizontal'},
-            'quad': {'count': 4, 'spacing': 50, 'layout': 'grid'}
-        }
-        return configs.get(arrangement, configs['single'])
-    
-    def _generate_outlet_geometry(self, outlet_type, dimensions, geometry_data, arrangement_config, custom_options):
-        """Generate 3D geometry for outlet"""
+    @timed(STL_STAGE_SECONDS, 'geometry')
+    def build_geometry(self, product_specs, arrangement, custom_options):
+        """Build indexed (vertices, faces) arrays for an outlet arrangement"""
+        # Get dimensions and geometry
+        dimensions = product_specs.get('dimensions', {})
+        geometry_data = product_specs.get('geometry_data', {})
         
-        width = dimensions.get('width', 70)
-        height = dimensions.get('height', 70)
-        depth = custom_options.get('depth', self.default_depth)
-        wall_thickness = custom_options.get('wall_thickness', self.default_wall_thickness)
+        # Generate mesh based on outlet type
+        outlet_type = product_specs.get('outlet_type', 'NEMA_5-15R')
         
-        vertices = []
-        faces = []
+        # Calculate arrangement multipliers
+        arrangement_config = self.arrangement_config(arrangement, product_specs)
+        shell = self.shell_dimensions(custom_options, product_specs)
+        return self._generate_outlet_geometry(
+            outlet_type, dimensions, geometry_data, arrangement_config, shell, custom_options
+        )
+    
+    @staticmethod
+    def arrangement_config(arrangement, product_specs=None):
+        """Rows, columns, pitch and a display name for an outlet arrangement.
+        
+        Accepts a named arrangement (unknown names fall back to single), a
+        "RxC" string such as "3x4", or a dict with rows, cols and an optional
+        pitch in mm (one number, or [x, y]). Named arrangements of
+        STACKED_OUTLET_TYPES run down a column instead of along a row.
+        Raises ValueError for an invalid or oversized grid, or, given the
+        product specs, a pitch that would overlap neighbouring outlets.
+        """
+        product_specs = product_specs or {}
+        outlet_type = product_specs.get('outlet_type', 'NEMA_5-15R')
+        if isinstance(arrangement, dict):
+            rows, cols = arrangement.get('rows', 1), arrangement.get('cols', 1)
+            pitch = arrangement.get('pitch')
+            if pitch is None or isinstance(pitch, (int, float)):
+                pitch = (pitch, pitch)
+        elif isinstance(arrangement, str):
+            match = GRID_PATTERN.match(arrangement)
+            if match is None:
+                name = arrangement if arrangement in ARRANGEMENTS else 'single'
+                config = dict(ARRANGEMENTS[name], name=name)
+                if outlet_type in STACKED_OUTLET_TYPES:
+                    # One column holding every outlet, so "quad" is 4x1 rather than 2x2
+                    config.update(rows=config['rows'] * config['cols'], cols=1, pitch=config['pitch'][::-1])
+                return config
+            rows, cols, pitch = int(match.group(1)), int(match.group(2)), (None, None)
+        else:
+            raise ValueError("arrangement must be a name, an \"RxC\" string or an object with rows and cols")
+        
+        if not all(isinstance(n, int) and not isinstance(n, bool) and n >= 1 for n in (rows, cols)):
+            raise ValueError("rows and cols must be positive integers")
+        if rows * cols > MAX_PANEL_OUTLETS:
+            raise ValueError(f"Panels are limited to {MAX_PANEL_OUTLETS} outlets")
+        if not isinstance(pitch, (list, tuple)) or len(pitch) != 2 or not all(
+            p is None or (isinstance(p, (int, float)) and not isinstance(p, bool) and p > 0) for p in pitch
+        ):
+            raise ValueError("pitch must be a positive number of millimetres or an [x, y] pair")
+        if product_specs:
+            width, height = _outlet_size(product_specs.get('dimensions', {}))
+            # Overlapping shells would intersect; MeshBuilder only merges outlets that touch
+            if (cols > 1 and pitch[0] is not None and pitch[0] < width and not math.isclose(pitch[0], width)) or \
+                    (rows > 1 and pitch[1] is not None and pitch[1] < height and not math.isclose(pitch[1], height)):
+                raise ValueError(f"pitch must be at least the outlet size ({width:g} x {height:g} mm)")
+        return {'rows': rows, 'cols': cols, 'pitch': tuple(pitch), 'name': f'{rows}x{cols}'}
+    
+    def _generate_outlet_geometry(self, outlet_type, dimensions, geometry_data, arrangement_config, shell, custom_options):
+        """Generate 3D geometry for outlet"""
+        
+        width, height = _outlet_size(dimensions)
+        depth, wall_thickness = shell
+        tolerance = self.chord_tolerance(custom_options)
         
         if outlet_type == 'NEMA_5-15R':
-            vertices, faces = self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config)
+            vertices, faces = self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance)
         elif outlet_type == 'BS_1363':
-            vertices, faces = self._generate_bs_1363(width, height, depth, wall_thickness, geometry_data, arrangement_config)
+            vertices, faces = self._generate_bs_1363(width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance)
         elif outlet_type == 'CEE_7/4':
-            vertices, faces = self._generate_cee_7_4(width, height, depth, wall_thickness, geometry_data, arrangement_config)
+            vertices, faces = self._generate_cee_7_4(width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance)
         elif outlet_type == 'USB_A':
             vertices, faces = self._generate_usb_a(width, height, depth, wall_thickness, geometry_data, arrangement_config)
         else:
             # Default to NEMA 5-15R
-            vertices, faces = self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config)
+            vertices, faces = self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance)
         
         return vertices, faces
     
-    def _generate_nema_5_15r(self, width, height, depth, wall_thickness, geometry_data, arrangement_config):
-        """Generate NEMA 5-15R outlet geometry"""
-        vertices = []
-        faces = []
+    def shell_dimensions(self, custom_options, product_specs=None):
+        """(depth, wall_thickness) in mm from the options, or the defaults.
         
-        # Convert mm to model units
-        w, h, d = width/2, height/2, depth
-        wt = wall_thickness
+        Raises ValueError unless each given value is a positive number and,
+        given the product specs, the walls leave room for the cavity and the
+        plug holes fit in the front wall inside it.
+        """
+        dimensions = []
+        for name, default in (('depth', self.default_depth), ('wall_thickness', self.default_wall_thickness)):
+            value = custom_options.get(name, default)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"{name} must be a positive number of millimetres")
+            dimensions.append(value)
+        depth, wall_thickness = dimensions
         
-        count = arrangement_config['count']
-        spacing = arrangement_config.get('spacing', 0)
+        if product_specs:
+            width, height = _outlet_size(product_specs.get('dimensions', {}))
+            # The cavity is the shell shrunk by one wall on every side
+            if 2 * wall_thickness >= depth:
+                raise ValueError("wall_thickness must be less than half the depth")
+            if 2 * wall_thickness >= min(width, height):
+                raise ValueError(f"wall_thickness must be less than half the outlet size ({width:g} x {height:g} mm)")
+            holes = tuple((hole['x'], hole['y'], hole['diameter'], None)
+                          for hole in product_specs.get('geometry_data', {}).get('holes', []))
+            if not _holes_fit(width/2 - wall_thickness, height/2 - wall_thickness, holes):
+                raise ValueError("The plug holes do not fit inside the cavity with this wall_thickness")
+        return depth, wall_thickness
+    
+    @staticmethod
+    def chord_tolerance(custom_options):
+        """Hole chord tolerance in mm from the options, or None for the fixed segment count.
         
-        for i in range(count):
-            x_offset = (i - (count-1)/2) * spacing if count > 1 else 0
-            
-            # Outer box vertices
-            outer_vertices = [
-                [-w + x_offset, -h, 0],      # 0: bottom-left-front
-                [w + x_offset, -h, 0],       # 1: bottom-right-front
-                [w + x_offset, h, 0],        # 2: top-right-front
-                [-w + x_offset, h, 0],       # 3: top-left-front
-                [-w + x_offset, -h, -d],     # 4: bottom-left-back
-                [w + x_offset, -h, -d],      # 5: bottom-right-back
-                [w + x_offset, h, -d],       # 6: top-right-back
-                [-w + x_offset, h, -d]       # 7: top-left-back
-            ]
-            
-            # Inner cavity vertices (for hollow outlet)
-            inner_vertices = [
-                [-w + wt + x_offset, -h + wt, -wt],        # 8: inner bottom-left-front
-                [w - wt + x_offset, -h + wt, -wt],         # 9: inner bottom-right-front
-                [w - wt + x_offset, h - wt, -wt],          # 10: inner top-right-front
-                [-w + wt + x_offset, h - wt, -wt],         # 11: inner top-left-front
-                [-w + wt + x_offset, -h + wt, -d + wt],    # 12: inner bottom-left-back
-                [w - wt + x_offset, -h + wt, -d + wt],     # 13: inner bottom-right-back
-                [w - wt + x_offset, h - wt, -d + wt],      # 14: inner top-right-back
-                [-w + wt + x_offset, h - wt, -d + wt]      # 15: inner top-left-back
-            ]
-            
-            base_idx = len(vertices)
-            vertices.extend(outer_vertices + inner_vertices)
-            
-            # Add holes for plugs (simplified as cylinders)
-            holes = geometry_data.get('holes', [])
-            for hole in holes:
-                hole_vertices, hole_faces = self._create_cylinder_hole(
-                    hole['x'] + x_offset, hole['y'], 0, 
-                    hole['diameter']/2, d, 12
-                )
-                hole_base_idx = len(vertices)
-                vertices.extend(hole_vertices)
-                faces.extend([[f[0] + hole_base_idx, f[1] + hole_base_idx, f[2] + hole_base_idx] for f in hole_faces])
-            
-            # Outer faces
-            outer_faces = [
-                # Front face (with holes cut out - simplified)
-                [base_idx + 0, base_idx + 1, base_idx + 2], [base_idx + 0, base_idx + 2, base_idx + 3],
-                # Back face
-                [base_idx + 4, base_idx + 7, base_idx + 6], [base_idx + 4, base_idx + 6, base_idx + 5],
-                # Left face
-                [base_idx + 0, base_idx + 3, base_idx + 7], [base_idx + 0, base_idx + 7, base_idx + 4],
-                # Right face
-                [base_idx + 1, base_idx + 5, base_idx + 6], [base_idx + 1, base_idx + 6, base_idx + 2],
-                # Top face
-                [base_idx + 3, base_idx + 2, base_idx + 6], [base_idx + 3, base_idx + 6, base_idx + 7],
-                # Bottom face
-                [base_idx + 0, base_idx + 4, base_idx + 5], [base_idx + 0, base_idx + 5, base_idx + 1]
-            ]
-            
-            # Inner faces (to create hollow interior)
-            inner_faces = [
-                # Inner front face
-                [base_idx + 8, base_idx + 11, base_idx + 10], [base_idx + 8, base_idx + 10, base_idx + 9],
-                # Inner back face
-                [base_idx + 12, base_idx + 13, base_idx + 14], [base_idx + 12, base_idx + 14, base_idx + 15],
-                # Inner walls
-                [base_idx + 8, base_idx + 9, base_idx + 13], [base_idx + 8, base_idx + 13, base_idx + 12],
-                [base_idx + 9, base_idx + 10, base_idx + 14], [base_idx + 9, base_idx + 14, base_idx + 13],
-                [base_idx + 10, base_idx + 11, base_idx + 15], [base_idx + 10, base_idx + 15, base_idx + 14],
-                [base_idx + 11, base_idx + 8, base_idx + 12], [base_idx + 11, base_idx + 12, base_idx + 15]
-            ]
-            
-            faces.extend(outer_faces + inner_faces)
+        An explicit chord_tolerance wins over a detail preset. Raises ValueError
+        for an unknown preset or a non-positive tolerance.
+        """
+        tolerance = custom_options.get('chord_tolerance')
+        if tolerance is None:
+            detail = custom_options.get('detail')
+            if detail is None:
+                return None
+            if detail not in DETAIL_TOLERANCES:
+                raise ValueError(f"Unknown detail level: {detail}")
+            return DETAIL_TOLERANCES[detail]
         
-        return vertices, faces
+        if isinstance(tolerance, bool) or not isinstance(tolerance, (int, float)) or tolerance <= 0:
+            raise ValueError("chord_tolerance must be a positive number of millimetres")
+        return float(tolerance)
+    
+    def _generate_nema_5_15r(self, width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance=None):
+        """Generate NEMA 5-15R outlet geometry"""
+        # One outlet is built (or fetched from the template cache) and instanced per position
+        holes = tuple(
+            (hole['x'], hole['y'], hole['diameter'], hole_segments(hole['diameter'] / 2, tolerance))
+            for hole in geometry_data.get('holes', [])
+        )
+        outlet_vertices, outlet_faces = _outlet_template(width, height, depth, wall_thickness, holes)
+        return _panel(outlet_vertices, outlet_faces, width, height, arrangement_config)
     
-    def _generate_bs_1363(self, width, height, depth, wall_thickness, geometry_data, arrangement_config):
+    def _generate_bs_1363(self, width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance=None):
         """Generate BS 1363 (UK) outlet geometry"""
         # Similar to NEMA but with different hole pattern
-        return self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config)
+        return self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance)
     
-    def _generate_cee_7_4(self, width, height, depth, wall_thickness, geometry_data, arrangement_config):
+    def _generate_cee_7_4(self, width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance=None):
         """Generate CEE 7/4 (Schuko) outlet geometry"""
         # Similar to NEMA but with different hole pattern and ground clips
-        return self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config)
+        return self._generate_nema_5_15r(width, height, depth, wall_thickness, geometry_data, arrangement_config, tolerance)
     
     def _generate_usb_a(self, width, height, depth, wall_thickness, geometry_data, arrangement_config):
         """Generate USB-A outlet geometry"""
-        vertices = []
-        faces = []
-        
-        w, h, d = width/2, height/2, depth
-        wt = wall_thickness
-        
-        count = arrangement_config['count']
-        spacing = arrangement_config.get('spacing', 30)
-        
-        for i in range(count):
-            y_offset = (i - (count-1)/2) * spacing if count > 1 else 0
-            
-            # Simple rectangular USB port
-            usb_vertices = [
-                [-w, -h + y_offset, 0], [w, -h + y_offset, 0],
-                [w, h + y_offset, 0], [-w, h + y_offset, 0],
-                [-w, -h + y_offset, -d], [w, -h + y_offset, -d],
-                [w, h + y_offset, -d], [-w, h + y_offset, -d]
-            ]
-            
-            base_idx = len(vertices)
-            vertices.extend(usb_vertices)
-            
-            # Simple box faces
-            usb_faces = [
-                [base_idx + 0, base_idx + 1, base_idx + 2], [base_idx + 0, base_idx + 2, base_idx + 3],
-                [base_idx + 4, base_idx + 7, base_idx + 6], [base_idx + 4, base_idx + 6, base_idx + 5],
-                [base_idx + 0, base_idx + 3, base_idx + 7], [base_idx + 0, base_idx + 7, base_idx + 4],
-                [base_idx + 1, base_idx + 5, base_idx + 6], [base_idx + 1, base_idx + 6, base_idx + 2],
-                [base_idx + 3, base_idx + 2, base_idx + 6], [base_idx + 3, base_idx + 6, base_idx + 7],
-                [base_idx + 0, base_idx + 4, base_idx + 5], [base_idx + 0, base_idx + 5, base_idx + 1]
-            ]
-            
-            faces.extend(usb_faces)
-        
-        return vertices, faces
+        # Simple rectangular USB port
+        usb_vertices = BOX_CORNERS * [width/2, height/2, depth]
+        return _panel(usb_vertices, BOX_OUTER_FACES, width, height, arrangement_config)
+
+def _outlet_size(dimensions):
+    """(width, height) of one outlet in mm"""
+    return dimensions.get('width', 70), dimensions.get('height', 70)
+
+def hole_segments(radius, tolerance=None):
+    """Polygon segment count keeping a circle of this radius within tolerance mm.
     
-    def _create_cylinder_hole(self, x, y, z, radius, depth, segments=12):
-        """Create cylindrical hole geometry"""
-        vertices = []
-        faces = []
-        
-        # Create cylinder vertices
-        for i in range(segments):
-            angle = 2 * math.pi * i / segments
-            cx = x + radius * math.cos(angle)
-            cy = y + radius * math.sin(angle)
-            vertices.append([cx, cy, z])  # Front circle
-            vertices.append([cx, cy, z - depth])  # Back circle
-        
-        # Create cylinder faces
-        for i in range(segments):
-            next_i = (i + 1) % segments
-            # Side faces
-            faces.append([i*2, next_i*2, next_i*2 + 1])
-            faces.append([i*2, next_i*2 + 1, i*2 + 1])
-        
-        return vertices, faces 
\ No newline at end of file
+    A chord spanning angle 2a deviates from the circle by r(1 - cos a), so
+    a = acos(1 - tolerance/r) and pi/a segments suffice. Without a tolerance
+    the historical fixed count is used.
+    """
+    if tolerance is None:
+        return DEFAULT_HOLE_SEGMENTS
+    if radius <= 0 or tolerance >= radius:
+        return MIN_HOLE_SEGMENTS
+    segments = math.ceil(math.pi / math.acos(1 - tolerance / radius))
+    return min(max(segments, MIN_HOLE_SEGMENTS), MAX_HOLE_SEGMENTS)
+
+@lru_cache(maxsize=32)
+def _unit_cylinder(segments):
+    """Open cylinder of radius 1 from z=0 to z=-1, cached per segment count.
+    
+    Vertex 2i lies on the front circle and 2i+1 on the back circle.
+    """
+    angles = 2 * np.pi * np.arange(segments) / segments
+    
+    vertices = np.empty((segments * 2, 3))
+    vertices[:, 0] = np.repeat(np.cos(angles), 2)
+    vertices[:, 1] = np.repeat(np.sin(angles), 2)
+    vertices[0::2, 2] = 0
+    vertices[1::2, 2] = -1
+    
+    # Two side faces per segment
+    front = np.arange(segments) * 2
+    next_front = np.roll(front, -1)
+    faces = np.empty((segments * 2, 3), dtype=np.intp)
+    faces[0::2] = np.column_stack([front, next_front, next_front + 1])
+    faces[1::2] = np.column_stack([front, next_front + 1, front + 1])
+    
+    return _read_only(vertices), _read_only(faces)
+
+@lru_cache(maxsize=256)
+def _outlet_template(width, height, depth, wall_thickness, holes):
+    """Geometry of one hollow outlet centred on the origin, cached by its parameters.
+    
+    holes is a tuple of (x, y, diameter, segments) so the arguments stay hashable.
+    Each hole is a tube through the front wall into the cavity, stitched into
+    both faces of the wall, so the outlet is one closed (watertight) surface.
+    """
+    w, h, d = width/2, height/2, depth
+    wt = wall_thickness
+    
+    # Outer box and inner cavity (for hollow outlet), 16 vertices
+    corners = np.concatenate([
+        BOX_CORNERS * [w, h, d],
+        BOX_CORNERS * [w - wt, h - wt, d - 2*wt] + [0, 0, -wt]
+    ])
+    if not _holes_fit(w - wt, h - wt, holes):
+        raise ValueError("Plug holes do not fit in the front wall inside the cavity")
+    
+    # Box and cavity without their front faces, which are rebuilt around the holes
+    builder = MeshBuilder()
+    builder.add(corners, np.concatenate([BOX_OUTER_FACES[2:], BOX_INNER_FACES[2:]]))
+    
+    rings = []
+    for x, y, diameter, segments in holes:
+        unit_vertices, unit_faces = _unit_cylinder(segments)
+        tube = unit_vertices * [diameter/2, diameter/2, wt] + [x, y, 0]
+        builder.add(tube, unit_faces)
+        # Front circle, clockwise as triangulate_polygon expects for holes
+        rings.append(tube[0::2, :2][::-1])
+    
+    builder.add(*_face_with_holes(corners[0:4], rings, 0))
+    # The inner front face looks into the cavity, so flip its winding
+    inner_vertices, inner_faces = _face_with_holes(corners[8:12], rings, -wt)
+    builder.add(inner_vertices, inner_faces[:, ::-1])
+    
+    vertices, faces = builder.build()
+    return _read_only(vertices), _read_only(faces)
+
+def _holes_fit(inner_w, inner_h, holes):
+    """Whether every hole lies inside the cavity's front face and clear of the others"""
+    for i, (x, y, diameter, _) in enumerate(holes):
+        r = diameter / 2
+        if abs(x) + r >= inner_w or abs(y) + r >= inner_h:
+            return False
+        for other_x, other_y, other_diameter, _ in holes[i + 1:]:
+            if np.hypot(x - other_x, y - other_y) <= r + other_diameter / 2:
+                return False
+    return True
+
+def _face_with_holes(corners, rings, z):
+    """Planar rectangle at height z with polygonal holes cut out, facing +z"""
+    # Box corners 0-3 run counter-clockwise seen from the front
+    outline = corners[:, :2]
+    points = np.concatenate([outline, *rings])
+    vertices = np.column_stack([points, np.full(len(points), z)])
+    return vertices, triangulate_polygon(outline, rings)
+
+def _panel(vertices, faces, width, height, arrangement_config):
+    """Lay one outlet out on the arrangement's rows x cols grid, centred on the origin"""
+    rows, cols = arrangement_config['rows'], arrangement_config['cols']
+    pitch_x, pitch_y = arrangement_config['pitch']
+    pitch_x = width if pitch_x is None else pitch_x
+    pitch_y = height if pitch_y is None else pitch_y
+    
+    # Row 0 is the top row; columns run left to right
+    row, col = np.divmod(np.arange(rows * cols), cols)
+    offsets = np.zeros((rows * cols, 3))
+    offsets[:, 0] = (col - (cols-1)/2) * pitch_x
+    offsets[:, 1] = ((rows-1)/2 - row) * pitch_y
+    vertices, faces = _instance(vertices, faces, offsets)
+    
+    # Outlets placed edge to edge share vertices and walls; merging makes the
+    # panel one shell. Spaced outlets have nothing to merge.
+    if (cols > 1 and math.isclose(pitch_x, width)) or (rows > 1 and math.isclose(pitch_y, height)):
+        vertices, faces = MeshBuilder().add(vertices, faces).build()
+    return vertices, faces
+
+def _instance(vertices, faces, offsets):
+    """Replicate one part at every row of an (N, 3) offset array by broadcasting"""
+    count = len(offsets)
+    instanced_vertices = (vertices[np.newaxis] + offsets[:, np.newaxis]).reshape(-1, 3)
+    face_offsets = np.arange(count, dtype=faces.dtype) * len(vertices)
+    instanced_faces = (faces[np.newaxis] + face_offsets[:, np.newaxis, np.newaxis]).reshape(-1, 3)
+    return instanced_vertices, instanced_faces
+
+def _read_only(array):
+    # Cached templates are shared between requests, so guard them against mutation
+    array.setflags(write=False)
+    return array
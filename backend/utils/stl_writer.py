@@ -0,0 +1,146 @@
+import numpy as np
+import gzip
+import struct
+import zipfile
+from .mesh_builder import weld_vertices
+
+# Binary STL: 80-byte header, uint32 triangle count, then one 50-byte record
+# per triangle (normal, three vertices, attribute byte count)
+STL_RECORD_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vectors', '<f4', (3, 3)),
+    ('attr', '<u2')
+])
+STL_HEADER = b'Binary STL generated by socket-classifier STLGenerator'
+DEFAULT_CHUNK_TRIANGLES = 8192  # ~400 KB of records per chunk
+DEFAULT_PRECISION = 6  # significant digits for text formats
+
+# Output format -> (file extension, mimetype)
+OUTPUT_FORMATS = {
+    'stl': ('.stl', 'model/stl'),
+    'stl-ascii': ('.stl', 'model/stl'),
+    'stl-gz': ('.stl.gz', 'application/gzip'),
+    '3mf': ('.3mf', 'model/3mf')
+}
+# Formats whose size depends on the precision option
+TEXT_FORMATS = {'stl-ascii', '3mf'}
+
+# 3MF is a zip package holding an XML mesh with shared, indexed vertices
+THREE_MF_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>\n'
+)
+THREE_MF_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>\n'
+)
+THREE_MF_MODEL_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<model unit="millimeter" xml:lang="en-US" '
+    'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+    '<resources>\n<object id="1" type="model">\n<mesh>\n'
+)
+THREE_MF_MODEL_FOOTER = '</mesh>\n</object>\n</resources>\n<build><item objectid="1"/></build>\n</model>\n'
+# Fixed timestamp so identical meshes produce identical archives
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+def triangle_normals(triangles):
+    """Unit normals for an (N, 3, 3) array of triangles; degenerate ones get zeros"""
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+def iter_binary_stl(vertices, faces, header=STL_HEADER, chunk_triangles=DEFAULT_CHUNK_TRIANGLES):
+    """Yield a binary STL in chunks.
+
+    Only chunk_triangles triangles are expanded from the indexed
+    (vertices, faces) arrays at a time, so the full triangle list is never
+    held in memory and the first bytes are available immediately.
+    """
+    # A header starting with "solid" makes some readers assume ASCII STL
+    header = header[:80].ljust(80, b' ')
+    yield header + struct.pack('<I', len(faces))
+
+    for start in range(0, len(faces), chunk_triangles):
+        triangles = vertices[faces[start:start + chunk_triangles]]
+        records = np.zeros(len(triangles), dtype=STL_RECORD_DTYPE)
+        records['vectors'] = triangles
+        records['normal'] = triangle_normals(triangles)
+        yield records.tobytes()
+
+def write_binary_stl(vertices, faces, fileobj, header=STL_HEADER, chunk_triangles=DEFAULT_CHUNK_TRIANGLES):
+    """Stream a binary STL to a writable file object, returning the bytes written"""
+    written = 0
+    for chunk in iter_binary_stl(vertices, faces, header, chunk_triangles):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+def iter_ascii_stl(vertices, faces, name='outlet', precision=DEFAULT_PRECISION,
+                   chunk_triangles=DEFAULT_CHUNK_TRIANGLES):
+    """Yield an ASCII STL in chunks, with coordinates to the given significant digits"""
+    number = f'%.{max(0, precision - 1)}e'
+    facet = (
+        f'facet normal {number} {number} {number}\n  outer loop\n' +
+        f'    vertex {number} {number} {number}\n' * 3 +
+        '  endloop\nendfacet\n'
+    )
+
+    yield f'solid {name}\n'.encode('ascii')
+    for start in range(0, len(faces), chunk_triangles):
+        triangles = vertices[faces[start:start + chunk_triangles]]
+        values = np.concatenate([triangle_normals(triangles), triangles.reshape(-1, 9)], axis=1)
+        # One %-format over the whole chunk is far faster than formatting per facet
+        yield ((facet * len(values)) % tuple(values.ravel().tolist())).encode('ascii')
+    yield f'endsolid {name}\n'.encode('ascii')
+
+def write_3mf(vertices, faces, fileobj, precision=DEFAULT_PRECISION, chunk_triangles=DEFAULT_CHUNK_TRIANGLES):
+    """Write a 3MF package with welded, indexed vertices to a writable file object"""
+    vertices, faces = weld_vertices(vertices, faces)
+    number = f'%.{precision}g'
+    vertex = f'<vertex x="{number}" y="{number}" z="{number}"/>\n'
+    triangle = '<triangle v1="%d" v2="%d" v3="%d"/>\n'
+
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in [('[Content_Types].xml', THREE_MF_CONTENT_TYPES), ('_rels/.rels', THREE_MF_RELS)]:
+            archive.writestr(_zip_info(name), content)
+
+        with archive.open(_zip_info('3D/3dmodel.model'), 'w') as model:
+            model.write(THREE_MF_MODEL_HEADER.encode('ascii'))
+            model.write(b'<vertices>\n')
+            for start in range(0, len(vertices), chunk_triangles):
+                chunk = vertices[start:start + chunk_triangles]
+                model.write(((vertex * len(chunk)) % tuple(chunk.ravel().tolist())).encode('ascii'))
+            model.write(b'</vertices>\n<triangles>\n')
+            for start in range(0, len(faces), chunk_triangles):
+                chunk = faces[start:start + chunk_triangles]
+                model.write(((triangle * len(chunk)) % tuple(chunk.ravel().tolist())).encode('ascii'))
+            model.write(b'</triangles>\n')
+            model.write(THREE_MF_MODEL_FOOTER.encode('ascii'))
+
+def _zip_info(name):
+    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+def write_mesh(vertices, faces, fileobj, output_format='stl', precision=DEFAULT_PRECISION):
+    """Write an indexed mesh in one of OUTPUT_FORMATS to a writable binary file object"""
+    if output_format == 'stl':
+        write_binary_stl(vertices, faces, fileobj)
+    elif output_format == 'stl-ascii':
+        for chunk in iter_ascii_stl(vertices, faces, precision=precision):
+            fileobj.write(chunk)
+    elif output_format == 'stl-gz':
+        # mtime=0 keeps the output byte-identical for identical meshes
+        with gzip.GzipFile(filename='', mode='wb', fileobj=fileobj, mtime=0) as compressed:
+            write_binary_stl(vertices, faces, compressed)
+    elif output_format == '3mf':
+        write_3mf(vertices, faces, fileobj, precision)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
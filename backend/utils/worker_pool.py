@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .image_pipeline import DecodedImage
+from .inference import ModelLoadError
+
+# Set in each worker process by _init_worker
+_worker_classifier = None
+
+class InferenceWorkerPool:
+    """Run classification in a pool of worker processes.
+
+    Decoded image views are copied once into a shared memory block and the
+    workers map them directly, so only offsets and shapes are pickled. Each
+    worker builds its own ElectricalSocketClassifier (and model) once.
+    """
+
+    def __init__(self, max_workers=None, engine=None, model_path=None, view='analysis', on_model_error=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.engine = engine
+        self.model_path = model_path
+        self.view = view  # which DecodedImage view the engine needs: 'analysis' or 'resized'
+        self.on_model_error = on_model_error  # called once if the workers cannot load the model
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created lazily, and per process, so it is never inherited across a fork
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    # spawn: forking a process that already runs threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                        initargs=(self.engine, self.model_path)
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def start(self):
+        """Start the worker processes and load their models ahead of the first request"""
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+            future.result()
+
+    def predict_batch(self, images):
+        """Classify DecodedImages across the worker processes, returning results in order"""
+        if not images:
+            return []
+        
+        try:
+            return self._predict_chunks(images)
+        except ModelLoadError as e:
+            if self.view == 'analysis':
+                raise
+            # The workers fell back to rules, which need the analysis view
+            self.view = 'analysis'
+            if self.on_model_error is not None:
+                self.on_model_error(e)
+            return self._predict_chunks(images)
+
+    def _predict_chunks(self, images):
+        # One contiguous chunk per worker, each in its own shared memory block
+        chunk_count = min(self.max_workers, len(images))
+        bounds = [len(images) * i // chunk_count for i in range(chunk_count + 1)]
+        executor = self._get_executor()
+        blocks = []
+        try:
+            futures = []
+            for start, end in zip(bounds, bounds[1:]):
+                block, layout, sizes = self._share(images[start:end])
+                blocks.append(block)
+                futures.append(executor.submit(_worker_predict, block.name, layout, sizes, self.view))
+            results = []
+            for future in futures:
+                results.extend(future.result())
+            return results
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def _share(self, images):
+        """Copy the images' views into a new shared memory block"""
+        arrays = [np.ascontiguousarray(getattr(image, self.view)) for image in images]
+        sizes = [image.size for image in images]
+
+        block = shared_memory.SharedMemory(create=True, size=max(1, sum(a.nbytes for a in arrays)))
+        try:
+            layout = []
+            offset = 0
+            for array in arrays:
+                np.ndarray(array.shape, array.dtype, buffer=block.buf, offset=offset)[...] = array
+                layout.append((offset, array.shape, array.dtype.str))
+                offset += array.nbytes
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+        return block, layout, sizes
+
+def _init_worker(engine, model_path):
+    global _worker_classifier
+    from .classifier import ElectricalSocketClassifier
+    _worker_classifier = ElectricalSocketClassifier(engine=engine, model_path=model_path)
+    _worker_classifier.load_model()
+
+def _ping():
+    return os.getpid()
+
+def _worker_predict(block_name, layout, sizes, view):
+    """Map the shared images, classify them and release the mapping"""
+    if view == 'resized' and _worker_classifier.model is None:
+        # Rules cannot run on the model-sized view; the pool resends the analysis view
+        raise ModelLoadError("The worker could not load the model")
+    block = shared_memory.SharedMemory(name=block_name)
+    images = None
+    try:
+        images = [
+            DecodedImage(**{view: np.ndarray(shape, np.dtype(dtype), buffer=block.buf, offset=offset)}, size=size)
+            for (offset, shape, dtype), size in zip(layout, sizes)
+        ]
+        return _worker_classifier.predict_batch(images)
+    finally:
+        # Views into the block must be gone before it can be closed
+        images = None
+        block.close()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Power Outlet Classification Application
+
+Runs entirely in-process (no network): micro-benchmarks for image
+preprocessing, classification, database lookups and STL generation, plus a
+load generator against the Flask test client. Results can be written as
+JSON and compared against a previous run:
+
+    python benchmark.py --json bench.json
+    python benchmark.py --compare bench.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(samples):
+    """Latency summary in milliseconds"""
+    samples = sorted(s * 1000.0 for s in samples)
+    return {
+        'n': len(samples),
+        'mean_ms': sum(samples) / len(samples) if samples else 0.0,
+        'min_ms': samples[0] if samples else 0.0,
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'p99_ms': percentile(samples, 99)
+    }
+
+def time_calls(fn, iterations, warmup=3):
+    """Time fn() individually for the given number of iterations"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def make_jpeg(width, height, seed=0):
+    """Synthetic socket-like test photo: a light plate with dark holes plus noise"""
+    import numpy as np
+    import cv2
+
+    rng = np.random.RandomState(seed)
+    image = np.full((height, width, 3), 200, dtype=np.uint8)
+    image += rng.randint(0, 30, image.shape, dtype=np.uint8)
+    for x, y in [(0.4, 0.4), (0.6, 0.4), (0.5, 0.65)]:
+        cv2.circle(image, (int(x * width), int(y * height)), max(2, width // 30), (20, 20, 20), -1)
+    ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return encoded.tobytes()
+
+def bench_classifier(iterations):
+    from utils.classifier import ElectricalSocketClassifier
+
+    classifier = ElectricalSocketClassifier()
+    results = {}
+    for label, (width, height) in [('640x480', (640, 480)), ('4000x3000', (4000, 3000))]:
+        data = make_jpeg(width, height)
+        results[f'preprocess_image[{label}]'] = time_calls(lambda: classifier.preprocess_image(data), iterations)
+        results[f'decode_image[{label}]'] = time_calls(lambda: classifier.decode_image(data), iterations)
+
+        image = classifier.decode_image(data)
+        results[f'_demo_classify[{label}]'] = time_calls(lambda: classifier._demo_classify(image), iterations)
+        results[f'predict_bytes[{label}]'] = time_calls(lambda: classifier.predict_bytes(data), iterations)
+    return results
+
+def bench_database(iterations, workdir):
+    from utils.database import Database
+
+    database = Database(os.path.join(workdir, 'bench', 'outlets.db'))
+    database.initialize()
+    return {
+        'get_product_by_type': time_calls(lambda: database.get_product_by_type('BS_1363'), iterations),
+        'get_product_specs': time_calls(lambda: database.get_product_specs('AS_3112'), iterations),
+        'get_all_outlet_types': time_calls(database.get_all_outlet_types, iterations)
+    }
+
+def bench_stl(iterations, workdir):
+    from utils.database import Database
+    from utils.stl_generator import STLGenerator
+
+    database = Database(os.path.join(workdir, 'bench', 'outlets.db'))
+    generator = STLGenerator()
+    results = {}
+    for outlet_type in ['NEMA_5-15R', 'AS_3112']:
+        specs = database.get_product_specs(outlet_type)
+        for arrangement in ['single', 'double', 'triple', 'quad', '3x4', '6x8']:
+            results[f'generate_outlet_stl[{outlet_type},{arrangement}]'] = time_calls(
+                lambda: generator.generate_outlet_stl(specs, arrangement, {}, io.BytesIO()), iterations
+            )
+    return results
+
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app
+timings = {'app_import_s': time.perf_counter() - start}
+client = app.app.test_client()
+start = time.perf_counter()
+client.get('/api/health')
+timings['first_health_check_s'] = time.perf_counter() - start
+start = time.perf_counter()
+app.warm_up()
+timings['warm_up_s'] = time.perf_counter() - start
+print(json.dumps(timings))
+'''
+
+def bench_startup(workdir, runs=3):
+    """Cold start in fresh interpreters: app import, first response and warm-up"""
+    startup_dir = os.path.join(workdir, 'startup')
+    os.makedirs(startup_dir, exist_ok=True)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, os.path.join(ROOT, 'backend')],
+                                cwd=startup_dir, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    # Best of several runs, to keep noise from other processes out
+    return {name: min(sample[name] for sample in samples) for name in samples[0]}
+
+def load_app(workdir):
+    """Import the Flask app with its data and generated folders inside workdir"""
+    os.chdir(workdir)
+    import app as backend_app
+    backend_app.database.initialize()
+    return backend_app
+
+def run_load(backend_app, requests_total, concurrency, distinct):
+    """Drive POST /api/classify + job polling from several threads"""
+    images = [make_jpeg(1024, 768, seed=i) for i in range(distinct)]
+    latencies = []
+    errors = []
+    counter = iter(range(requests_total))
+    lock = threading.Lock()
+
+    def worker():
+        client = backend_app.app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            response = client.post('/api/classify', content_type='multipart/form-data',
+                                   data={'image': (io.BytesIO(images[i % distinct]), 'bench.jpg')})
+            body = response.get_json()
+            if response.status_code == 202:
+                status_url = body['status_url']
+                while body.get('status') not in ('completed', 'failed'):
+                    time.sleep(0.002)
+                    response = client.get(status_url)
+                    body = response.get_json()
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status_code >= 400 or body.get('status') != 'completed':
+                    errors.append(response.status_code)
+                else:
+                    latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    summary = summarize(latencies)
+    summary.update({
+        'concurrency': concurrency,
+        'distinct_images': distinct,
+        'errors': len(errors),
+        'wall_s': wall,
+        'throughput_rps': len(latencies) / wall if wall else 0.0
+    })
+    return summary
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except Exception:
+        return None
+
+def print_section(title, results):
+    print(f"\n{title}")
+    print("-" * 96)
+    for name, stats in results.items():
+        print(f"{name:<58} p50 {stats['p50_ms']:>9.3f}ms  p95 {stats['p95_ms']:>9.3f}ms  p99 {stats['p99_ms']:>9.3f}ms")
+
+def compare(previous, current):
+    """Print p50 changes against an earlier JSON report"""
+    print(f"\nComparison against {previous.get('meta', {}).get('commit')} (p50, + is slower)")
+    print("-" * 96)
+    for name, seconds in current.get('startup', {}).items():
+        old = previous.get('startup', {}).get(name)
+        if old:
+            change = (seconds - old) / old * 100.0
+            print(f"{'startup: ' + name:<70} {old * 1000:>9.3f} -> {seconds * 1000:>9.3f}ms  {change:+6.1f}%")
+    for section in ('classifier', 'database', 'stl', 'load'):
+        old_section = previous.get(section, {})
+        for name, stats in current.get(section, {}).items():
+            old = old_section.get(name)
+            if not old or not old.get('p50_ms'):
+                continue
+            change = (stats['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100.0
+            print(f"{section + ': ' + name:<70} {old['p50_ms']:>9.3f} -> {stats['p50_ms']:>9.3f}ms  {change:+6.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50, help='timed calls per micro-benchmark')
+    parser.add_argument('--requests', type=int, default=200, help='requests for the load test')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads for the load test')
+    parser.add_argument('--distinct-images', type=int, default=200,
+                        help='distinct images in the load test (fewer means more result-cache hits)')
+    parser.add_argument('--skip-load', action='store_true', help='only run micro-benchmarks')
+    parser.add_argument('--json', metavar='PATH', help='write results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='compare against an earlier JSON report')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'iterations': args.iterations
+        }
+    }
+
+    print("Power Outlet Classification App - Benchmarks")
+    print("=" * 96)
+
+    with tempfile.TemporaryDirectory(prefix='outlet-bench-') as workdir:
+        report['startup'] = bench_startup(workdir)
+        print("\nStartup (fresh interpreter)")
+        print("-" * 96)
+        for name, seconds in report['startup'].items():
+            print(f"{name:<58} {seconds * 1000:>9.1f}ms")
+        
+        report['classifier'] = bench_classifier(args.iterations)
+        print_section("Classifier", report['classifier'])
+
+        report['database'] = bench_database(args.iterations * 20, workdir)
+        print_section("Database", report['database'])
+
+        report['stl'] = bench_stl(args.iterations, workdir)
+        print_section("STL generation", report['stl'])
+
+        if not args.skip_load:
+            backend_app = load_app(workdir)
+            report['load'] = {
+                'classify': run_load(backend_app, args.requests, args.concurrency, args.distinct_images)
+            }
+            print_section("Load (POST /api/classify until the job completes)", report['load'])
+            load = report['load']['classify']
+            print(f"throughput {load['throughput_rps']:.1f} req/s, errors {load['errors']}")
+            os.chdir(ROOT)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,10 @@ import ImageUpload from './components/ImageUpload';
 import ProductShowcase from './components/ProductShowcase';
 import './App.css';
 
+const JOB_POLL_INTERVAL_MS = 500;
+// A job orphaned by a restarted worker never finishes, so polling gives up
+const JOB_TIMEOUT_MS = 60000;
+
 const theme = createTheme({
   palette: {
     primary: {
@@ -25,6 +29,26 @@ function App() {
   const [isLoading, setIsLoading] = React.useState(false);
   const [loadingMessage, setLoadingMessage] = React.useState('');
 
+  const waitForJob = async (statusUrl) => {
+    // Poll the background job until the server reports a final state
+    const deadline = Date.now() + JOB_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+      const response = await fetch(statusUrl);
+      if (!response.ok) {
+        throw new Error('Job status request failed');
+      }
+      const job = await response.json();
+      if (job.status === 'completed') {
+        return job.result;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Classification failed');
+      }
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+    throw new Error('Classification timed out');
+  };
+
   const handleImageUpload = async (file) => {
     setIsLoading(true);
     setLoadingMessage('We are recognizing your electrical socket...');
@@ -39,7 +63,9 @@ function App() {
       });
       
       if (response.ok) {
-        const data = await response.json();
+        const job = await response.json();
+        // Cached classifications come back already completed
+        const data = job.status === 'completed' ? job.result : await waitForJob(job.status_url);
         setClassificationData(data);
         setIsLoading(false);
       } else {
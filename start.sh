@@ -1,3 +1,3 @@
 #!/bin/bash
 cd backend
-python app.py 
\ No newline at end of file
+exec gunicorn --config gunicorn.conf.py app:app
@@ -5,6 +5,7 @@ Test script for Power Outlet Classification Application
 
 import os
 import sys
+import tempfile
 import requests
 import json
 
@@ -82,6 +83,42 @@ def test_classifier():
         print(f"✗ Classifier error: {e}")
         return False
 
+def test_stl_generator():
+    """Test that every outlet type and arrangement produces a watertight mesh"""
+    try:
+        sys.path.append('backend')
+        from utils.database import Database
+        from utils.stl_generator import STLGenerator, ARRANGEMENTS, DETAIL_TOLERANCES
+        from utils.mesh_builder import is_watertight
+        
+        # A fresh catalog, so the test does not depend on the server's database
+        db = Database(os.path.join(tempfile.mkdtemp(), 'outlets.db'))
+        db.initialize()
+        generator = STLGenerator()
+        arrangements = list(ARRANGEMENTS) + ['3x4']
+        detail_levels = [None] + list(DETAIL_TOLERANCES)
+        
+        meshes = 0
+        for outlet in db.get_all_outlet_types():
+            product_specs = db.get_product_specs(outlet['type'])
+            for arrangement in arrangements:
+                for detail in detail_levels:
+                    custom_options = {} if detail is None else {'detail': detail}
+                    vertices, faces = generator.build_geometry(product_specs, arrangement, custom_options)
+                    if not is_watertight(faces):
+                        print(f"✗ Mesh is not watertight: {outlet['type']}, {arrangement}, detail {detail}")
+                        return False
+                    meshes += 1
+        
+        if meshes == 0:
+            print("✗ No outlet types to generate")
+            return False
+        print(f"✓ STL generator working - {meshes} watertight meshes")
+        return True
+    except Exception as e:
+        print(f"✗ STL generator error: {e}")
+        return False
+
 def test_image_processing():
     """Test image processing functionality"""
     try: